@@ -0,0 +1,29 @@
+"""add user listing indexes
+
+Revision ID: 8b4e6d2f0a13
+Revises: 3f2a9c1b7d01
+Create Date: 2026-10-17 10:03:11.540917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4e6d2f0a13'
+down_revision: Union[str, None] = '3f2a9c1b7d01'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset pagination of GET /users seeks on (filter, id)
+    op.create_index('ix_users_is_active_id', 'users', ['is_active', 'id'], unique=False)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_users_is_active_id', table_name='users')
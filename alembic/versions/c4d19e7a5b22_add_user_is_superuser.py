@@ -0,0 +1,27 @@
+"""add user is_superuser
+
+Revision ID: c4d19e7a5b22
+Revises: 8b4e6d2f0a13
+Create Date: 2026-10-17 14:26:03.482915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d19e7a5b22'
+down_revision: Union[str, None] = '8b4e6d2f0a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Admins are promoted in the database; no API sets this flag
+    op.add_column('users', sa.Column('is_superuser', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'is_superuser')
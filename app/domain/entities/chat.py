@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import List, Optional, Tuple
 from datetime import datetime
 from uuid import UUID, uuid4
+import base64
 
 class ChatMessage(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid4()))
@@ -9,17 +10,59 @@ class ChatMessage(BaseModel):
     sender: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     room_id: str
+    # Encoded JSON, computed once and shared by every frame carrying this message
+    _json: Optional[str] = PrivateAttr(default=None)
 
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat(),
         }
 
+    def to_json(self) -> str:
+        """Return the JSON encoding of this message, encoding it at most once."""
+        if self._json is None:
+            self._json = self.model_dump_json()
+        return self._json
+
+    @property
+    def sort_key(self) -> Tuple[datetime, str]:
+        """Position of the message in a room's history."""
+        return (self.timestamp, self.id)
+
+class MessageCursor(BaseModel):
+    """Opaque keyset position in a room's history, ordered by (timestamp, id)."""
+    timestamp: datetime
+    id: str
+
+    @classmethod
+    def from_message(cls, message: ChatMessage) -> "MessageCursor":
+        return cls(timestamp=message.timestamp, id=message.id)
+
+    @classmethod
+    def decode(cls, cursor: str) -> "MessageCursor":
+        """Parse a cursor produced by `encode`. Raises ValueError if it is malformed."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode() + b"=" * (-len(cursor) % 4)).decode()
+            timestamp, message_id = raw.split("|", 1)
+            return cls(timestamp=datetime.fromisoformat(timestamp), id=message_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    def encode(self) -> str:
+        raw = f"{self.timestamp.isoformat()}|{self.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @property
+    def sort_key(self) -> Tuple[datetime, str]:
+        return (self.timestamp, self.id)
+
 class ChatRoom(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid4()))
     name: str
     participants: List[str] = []
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Bumped on every join and leave so clients can detect missed presence deltas
+    presence_version: int = 0
 
     class Config:
         json_encoders = {
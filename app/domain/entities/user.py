@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, Any
+from typing import Optional, Any, List
 from datetime import datetime, timezone, timedelta
 
 class Token(BaseModel):
@@ -37,9 +37,39 @@ class UserInDB(UserBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     is_active: bool = True
+    is_superuser: bool = False
 
     class Config:
         from_attributes = True
         json_encoders = {
             datetime: lambda v: v.isoformat() if v else None
         }
+
+class Principal(BaseModel):
+    """The credentials checked at login, without the rest of the profile."""
+    id: int
+    email: str
+    hashed_password: str
+    is_active: bool = True
+
+class UserSummary(UserBase):
+    """User as listed to admin tooling, without credentials."""
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+class UserImportError(BaseModel):
+    """A row of a bulk import that could not be written."""
+    line: int
+    email: Optional[str] = None
+    error: str
+
+class UserImportResult(BaseModel):
+    """Outcome of a bulk user import."""
+    total: int = 0
+    written: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: List[UserImportError] = []
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
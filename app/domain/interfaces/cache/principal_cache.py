@@ -0,0 +1,9 @@
+from abc import ABC, abstractmethod
+
+class IPrincipalCache(ABC):
+    """Cache of authenticated principals that must forget users when they change."""
+    
+    @abstractmethod
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached principal belonging to a user."""
+        pass
@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+class IEventPublisher(ABC):
+    """Publishes domain events without making the caller wait for delivery."""
+    
+    @abstractmethod
+    def publish(self, event_type: str, data: Dict[str, Any], key: Optional[str] = None) -> bool:
+        """Queue an event for delivery; returns False if it had to be dropped.
+        
+        Events with the same `key` are delivered in order.
+        """
+        pass
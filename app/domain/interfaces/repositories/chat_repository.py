@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from app.domain.entities.chat import ChatMessage, ChatRoom
+from typing import AsyncIterator, List, Optional, Tuple
+from app.domain.entities.chat import ChatMessage, ChatRoom, MessageCursor
 
 class ChatRepository(ABC):
     """Abstract base class for chat repository operations."""
@@ -10,11 +10,56 @@ class ChatRepository(ABC):
         """Save a chat message to the repository."""
         pass
     
+    async def save_messages(self, messages: List[ChatMessage]) -> None:
+        """Save several chat messages at once, in order."""
+        for message in messages:
+            await self.save_message(message)
+    
     @abstractmethod
-    async def get_messages(self, room_id: str, limit: int = 100) -> List[ChatMessage]:
-        """Retrieve messages for a specific room."""
+    async def get_messages(
+        self,
+        room_id: str,
+        limit: int = 100,
+        before: Optional[MessageCursor] = None,
+        after: Optional[MessageCursor] = None
+    ) -> List[ChatMessage]:
+        """Retrieve the newest `limit` messages of a room, most recent first.
+        
+        `before` and `after` are exclusive keyset bounds on (timestamp, id).
+        With only `after`, the page holds the oldest `limit` messages after
+        it instead, still most recent first, so paging forward skips nothing.
+        """
         pass
     
+    async def iter_messages(
+        self,
+        room_id: str,
+        limit: int = 100,
+        before: Optional[MessageCursor] = None,
+        after: Optional[MessageCursor] = None,
+        chunk_size: int = 100
+    ) -> AsyncIterator[ChatMessage]:
+        """Yield up to `limit` messages, fetching one chunk at a time.
+        
+        Messages come most recent first, except with only `after`: then
+        they come oldest first, moving forward from the cursor as
+        `get_messages` pages do.
+        """
+        forward = after is not None and before is None
+        remaining = limit
+        while remaining > 0:
+            page_size = min(chunk_size, remaining)
+            page = await self.get_messages(room_id, page_size, before=before, after=after)
+            for message in (reversed(page) if forward else page):
+                yield message
+            if len(page) < page_size:
+                return
+            remaining -= len(page)
+            if forward:
+                after = MessageCursor.from_message(page[0])
+            else:
+                before = MessageCursor.from_message(page[-1])
+    
     @abstractmethod
     async def get_room(self, room_id: str) -> Optional[ChatRoom]:
         """Get a chat room by ID."""
@@ -26,16 +71,34 @@ class ChatRepository(ABC):
         pass
     
     @abstractmethod
-    async def add_participant(self, room_id: str, user_id: str) -> None:
-        """Add a participant to a chat room."""
+    async def add_participant(self, room_id: str, user_id: str) -> int:
+        """Add a participant to a chat room and return the new presence version."""
+        pass
+    
+    @abstractmethod
+    async def remove_participant(self, room_id: str, user_id: str) -> int:
+        """Remove a participant from a chat room and return the new presence version."""
         pass
     
     @abstractmethod
-    async def remove_participant(self, room_id: str, user_id: str) -> None:
-        """Remove a participant from a chat room."""
+    async def get_participants(
+        self,
+        room_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[str], Optional[str]]:
+        """Return a page of a room's participants and the cursor of the next page, if any."""
         pass
     
     @abstractmethod
     async def list_rooms(self) -> List[ChatRoom]:
         """List all available chat rooms."""
         pass
+    
+    async def start(self) -> None:
+        """Load persisted state and start background work before first use."""
+        pass
+    
+    async def close(self) -> None:
+        """Flush pending writes and release resources."""
+        pass
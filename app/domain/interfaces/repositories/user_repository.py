@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Optional
-from app.domain.entities.user import UserInDB, UserCreate, UserUpdate
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.domain.entities.user import Principal, UserInDB, UserCreate, UserUpdate, UserSummary
 
 class IUserRepository(ABC):
     @abstractmethod
@@ -11,14 +12,84 @@ class IUserRepository(ABC):
     async def get_by_email(self, email: str) -> Optional[UserInDB]:
         pass
     
+    async def get_principal_by_email(self, email: str) -> Optional[Principal]:
+        """Load just what login needs; repositories may fetch fewer columns."""
+        user = await self.get_by_email(email)
+        if user is None:
+            return None
+        return Principal(id=user.id, email=user.email, hashed_password=user.hashed_password, is_active=user.is_active)
+    
     @abstractmethod
     async def create(self, user: UserCreate) -> UserInDB:
+        """Create a user; raises ValueError if the email or username is taken."""
         pass
     
     @abstractmethod
     async def update(self, user_id: int, user_update: UserUpdate) -> Optional[UserInDB]:
+        """Update a user, returning None if it does not exist; raises ValueError on conflicts."""
         pass
     
     @abstractmethod
     async def delete(self, user_id: int) -> bool:
         pass
+    
+    async def on_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Run `callback` once the writes made so far are committed.
+        
+        Repositories whose writes are committed later, by the owner of the
+        unit of work, defer it until then and drop it on rollback. By
+        default it runs at once.
+        """
+        await callback()
+    
+    @abstractmethod
+    async def bulk_create(self, users: List[UserCreate], on_conflict: str = "ignore") -> Tuple[int, Dict[int, str]]:
+        """Insert many users at once.
+        
+        `on_conflict` is "ignore" (keep existing users) or "upsert"
+        (overwrite users with the same email; a row whose username belongs
+        to another email fails instead). The chunk is committed on its own.
+        Returns the number of rows written and a mapping of failed row
+        indexes to their error.
+        """
+        pass
+    
+    @abstractmethod
+    async def list_users(
+        self,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> List[UserSummary]:
+        """List users after the user `after_id` (keyset pagination).
+        
+        Users come in id order, or in (created_at, id) order when filtered
+        by creation date. Raises ValueError if the filtered order is asked
+        to continue after a user that does not exist.
+        """
+        pass
+    
+    async def iter_users(
+        self,
+        after_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        chunk_size: int = 1000
+    ) -> AsyncIterator[UserSummary]:
+        """Yield every matching user in `list_users` order, fetching one page at a time."""
+        while True:
+            page = await self.list_users(
+                chunk_size,
+                after_id=after_id,
+                is_active=is_active,
+                created_after=created_after,
+                created_before=created_before
+            )
+            for user in page:
+                yield user
+            if len(page) < chunk_size:
+                return
+            after_id = page[-1].id
@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+class IPasswordHasher(ABC):
+    """Hashes and verifies passwords without blocking the event loop."""
+    
+    @abstractmethod
+    async def hash(self, password: str) -> str:
+        """Return a salted hash of a password."""
+        pass
+    
+    @abstractmethod
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Check a password against a stored hash."""
+        pass
+    
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """Hash several passwords; implementations may spread the work out."""
+        return [await self.hash(password) for password in passwords]
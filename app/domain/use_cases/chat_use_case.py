@@ -1,14 +1,16 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 from uuid import UUID
 
-from app.domain.entities.chat import ChatMessage, ChatRoom
+from app.domain.entities.chat import ChatMessage, ChatRoom, MessageCursor
+from app.domain.interfaces.events.event_publisher import IEventPublisher
 from app.domain.interfaces.repositories.chat_repository import ChatRepository
 
 class ChatUseCase:
     """Handles chat-related business logic."""
     
-    def __init__(self, chat_repository: ChatRepository):
+    def __init__(self, chat_repository: ChatRepository, event_publisher: Optional[IEventPublisher] = None):
         self.chat_repository = chat_repository
+        self.event_publisher = event_publisher
 
     async def send_message(
         self, 
@@ -33,12 +35,27 @@ class ChatUseCase:
             room_id=room_id
         )
         await self.chat_repository.save_message(message)
+        if self.event_publisher is not None:
+            # Keyed by room, so each room's messages stay in order
+            self.event_publisher.publish(
+                "chat.message_sent",
+                {
+                    "id": message.id,
+                    "room_id": message.room_id,
+                    "sender": message.sender,
+                    "content": message.content,
+                    "timestamp": message.timestamp,
+                },
+                key=room_id
+            )
         return message
 
     async def get_room_messages(
         self, 
         room_id: str, 
-        limit: int = 100
+        limit: int = 100,
+        before: Optional[MessageCursor] = None,
+        after: Optional[MessageCursor] = None
     ) -> List[ChatMessage]:
         """
         Retrieve messages from a chat room.
@@ -46,11 +63,39 @@ class ChatUseCase:
         Args:
             room_id: ID of the room to get messages from
             limit: Maximum number of messages to return
+            before: Only return messages older than this cursor
+            after: Only return messages newer than this cursor
             
         Returns:
-            List of ChatMessage objects
+            List of ChatMessage objects, most recent first
         """
-        return await self.chat_repository.get_messages(room_id, limit)
+        return await self.chat_repository.get_messages(
+            room_id, limit, before=before, after=after
+        )
+
+    def stream_room_messages(
+        self, 
+        room_id: str, 
+        limit: int = 100,
+        before: Optional[MessageCursor] = None,
+        after: Optional[MessageCursor] = None
+    ) -> AsyncIterator[ChatMessage]:
+        """
+        Stream messages from a chat room as the repository produces them.
+        
+        Args:
+            room_id: ID of the room to get messages from
+            limit: Maximum number of messages to yield
+            before: Only yield messages older than this cursor
+            after: Only yield messages newer than this cursor
+            
+        Returns:
+            Async iterator of ChatMessage objects, most recent first (oldest
+            first when only `after` is given)
+        """
+        return self.chat_repository.iter_messages(
+            room_id, limit, before=before, after=after
+        )
 
     async def create_room(self, name: str) -> ChatRoom:
         """
@@ -64,7 +109,7 @@ class ChatUseCase:
         """
         return await self.chat_repository.create_room(name)
 
-    async def join_room(self, room_id: str, user_id: str) -> ChatRoom:
+    async def join_room(self, room_id: str, user_id: str) -> int:
         """
         Add a user to a chat room.
         
@@ -73,12 +118,11 @@ class ChatUseCase:
             user_id: ID of the user joining
             
         Returns:
-            The updated ChatRoom
+            The room's presence version after the join
         """
-        await self.chat_repository.add_participant(room_id, user_id)
-        return await self.chat_repository.get_room(room_id)
+        return await self.chat_repository.add_participant(room_id, user_id)
 
-    async def leave_room(self, room_id: str, user_id: str) -> ChatRoom:
+    async def leave_room(self, room_id: str, user_id: str) -> int:
         """
         Remove a user from a chat room.
         
@@ -87,10 +131,28 @@ class ChatUseCase:
             user_id: ID of the user leaving
             
         Returns:
-            The updated ChatRoom
+            The room's presence version after the leave
         """
-        await self.chat_repository.remove_participant(room_id, user_id)
-        return await self.chat_repository.get_room(room_id)
+        return await self.chat_repository.remove_participant(room_id, user_id)
+
+    async def get_participants(
+        self, 
+        room_id: str, 
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[str], Optional[str]]:
+        """
+        Get one page of a chat room's participants.
+        
+        Args:
+            room_id: ID of the room
+            limit: Maximum number of participants to return
+            cursor: Cursor returned with the previous page
+            
+        Returns:
+            The participant IDs and the cursor of the next page, or None
+        """
+        return await self.chat_repository.get_participants(room_id, limit, cursor)
 
     async def list_rooms(self) -> List[ChatRoom]:
         """
@@ -1,13 +1,25 @@
-from typing import Optional, List
-from app.domain.entities.user import UserInDB, UserCreate, UserUpdate
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+import time
+from pydantic import ValidationError
+from app.domain.entities.user import Principal, UserInDB, UserCreate, UserUpdate, UserSummary, UserImportError, UserImportResult
 from app.domain.interfaces.repositories.user_repository import IUserRepository
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.domain.interfaces.cache.principal_cache import IPrincipalCache
+from app.domain.interfaces.events.event_publisher import IEventPublisher
+from app.domain.interfaces.security.password_hasher import IPasswordHasher
 
 class UserUseCase:
-    def __init__(self, user_repository: IUserRepository):
+    def __init__(
+        self,
+        user_repository: IUserRepository,
+        password_hasher: IPasswordHasher,
+        principal_cache: Optional[IPrincipalCache] = None,
+        event_publisher: Optional[IEventPublisher] = None
+    ):
         self.user_repository = user_repository
+        self.password_hasher = password_hasher
+        self.principal_cache = principal_cache
+        self.event_publisher = event_publisher
     
     async def get_user(self, user_id: int) -> Optional[UserInDB]:
         return await self.user_repository.get_by_id(user_id)
@@ -15,41 +27,156 @@ class UserUseCase:
     async def get_user_by_email(self, email: str) -> Optional[UserInDB]:
         return await self.user_repository.get_by_email(email)
     
+    async def list_users(
+        self,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> List[UserSummary]:
+        return await self.user_repository.list_users(
+            limit,
+            after_id=after_id,
+            is_active=is_active,
+            created_after=created_after,
+            created_before=created_before
+        )
+    
+    def stream_users(
+        self,
+        after_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> AsyncIterator[UserSummary]:
+        return self.user_repository.iter_users(
+            after_id=after_id,
+            is_active=is_active,
+            created_after=created_after,
+            created_before=created_before
+        )
+    
     async def create_user(self, user: UserCreate) -> UserInDB:
-        # Check if user with email already exists
-        existing_user = await self.user_repository.get_by_email(user.email)
-        if existing_user:
-            raise ValueError("User with this email already exists")
+        # The repository maps unique-constraint violations to ValueError
+        created_user = await self.user_repository.create(user)
+        event_publisher = self.event_publisher
+        if event_publisher is not None:
+            # Only once the row is committed: a rolled-back insert must not be announced
+            async def publish() -> None:
+                event_publisher.publish(
+                    "user.created",
+                    {"id": created_user.id, "email": created_user.email, "username": created_user.username},
+                    key=str(created_user.id)
+                )
             
-        # Create new user
-        return await self.user_repository.create(user)
+            await self.user_repository.on_commit(publish)
+        return created_user
     
     async def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[UserInDB]:
-        # Check if user exists
-        existing_user = await self.user_repository.get_by_id(user_id)
-        if not existing_user:
+        # Existence and email uniqueness are enforced by the UPDATE itself
+        updated_user = await self.user_repository.update(user_id, user_update)
+        if updated_user is None:
             raise ValueError("User not found")
-            
-        # Check if email is being updated to an existing email
-        if user_update.email and user_update.email != existing_user.email:
-            email_exists = await self.user_repository.get_by_email(user_update.email)
-            if email_exists:
-                raise ValueError("Email already in use")
-                
-        return await self.user_repository.update(user_id, user_update)
+        await self._forget_principal(user_id)
+        return updated_user
     
     async def delete_user(self, user_id: int) -> bool:
-        # Check if user exists
-        existing_user = await self.user_repository.get_by_id(user_id)
-        if not existing_user:
+        deleted = await self.user_repository.delete(user_id)
+        if not deleted:
             raise ValueError("User not found")
-            
-        return await self.user_repository.delete(user_id)
+        await self._forget_principal(user_id)
+        return deleted
+    
+    async def _forget_principal(self, user_id: int) -> None:
+        """Drop the user's cached bearer tokens once the change is committed.
+        
+        Dropping them earlier would let a concurrent request re-cache the
+        old user before the commit.
+        """
+        principal_cache = self.principal_cache
+        if principal_cache is None:
+            return
+        
+        async def invalidate() -> None:
+            principal_cache.invalidate_user(user_id)
+        
+        await self.user_repository.on_commit(invalidate)
     
-    async def authenticate_user(self, email: str, password: str) -> Optional[UserInDB]:
-        user = await self.user_repository.get_by_email(email)
+    async def authenticate_user(self, email: str, password: str) -> Optional[Principal]:
+        user = await self.user_repository.get_principal_by_email(email)
         if not user:
             return None
-        if not pwd_context.verify(password, user.hashed_password):
+        if not await self.password_hasher.verify(password, user.hashed_password):
             return None
         return user
+    
+    async def import_users(
+        self,
+        records: AsyncIterable[Tuple[int, Union[Dict[str, Any], ValueError]]],
+        on_conflict: str = "ignore",
+        chunk_size: int = 1000,
+        max_errors: int = 1000,
+        progress: Optional[Callable[[UserImportResult], None]] = None
+    ) -> UserImportResult:
+        """
+        Create users in bulk from a stream of raw records.
+        
+        Args:
+            records: (line number, record) pairs; undecodable lines are ValueErrors
+            on_conflict: "ignore" keeps existing users, "upsert" overwrites them by email
+            chunk_size: Number of users written per multi-row INSERT
+            max_errors: Number of row failures kept in the result (all are counted)
+            progress: Called with the running result after every chunk
+            
+        Returns:
+            UserImportResult: Counts, per-row failures and throughput
+        """
+        if on_conflict not in ("ignore", "upsert"):
+            raise ValueError("on_conflict must be 'ignore' or 'upsert'")
+        
+        result = UserImportResult()
+        started = time.perf_counter()
+        
+        def fail(line: int, email: Optional[str], error: str) -> None:
+            result.failed += 1
+            if len(result.errors) < max_errors:
+                result.errors.append(UserImportError(line=line, email=email, error=error))
+        
+        async def flush(users: List[UserCreate], lines: List[int]) -> None:
+            written, failures = await self.user_repository.bulk_create(users, on_conflict)
+            result.written += written
+            if on_conflict == "ignore":
+                result.skipped += len(users) - written - len(failures)
+            for index, error in failures.items():
+                fail(lines[index], users[index].email, error)
+            result.elapsed_seconds = time.perf_counter() - started
+            result.rows_per_second = result.total / result.elapsed_seconds
+            if progress is not None:
+                progress(result)
+        
+        users: List[UserCreate] = []
+        lines: List[int] = []
+        async for line, record in records:
+            result.total += 1
+            if isinstance(record, Exception):
+                fail(line, None, str(record))
+                continue
+            try:
+                users.append(UserCreate.model_validate(record))
+                lines.append(line)
+            except ValidationError as e:
+                error = "; ".join(
+                    f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+                )
+                fail(line, record.get("email"), error)
+                continue
+            if len(users) >= chunk_size:
+                await flush(users, lines)
+                users, lines = [], []
+        if users:
+            await flush(users, lines)
+        
+        result.elapsed_seconds = time.perf_counter() - started
+        result.rows_per_second = result.total / result.elapsed_seconds if result.elapsed_seconds else 0.0
+        return result
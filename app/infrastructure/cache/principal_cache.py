@@ -0,0 +1,94 @@
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Set
+import hashlib
+import time
+
+from app.domain.entities.user import UserInDB
+from app.domain.interfaces.cache.principal_cache import IPrincipalCache
+from app.infrastructure.config import get_settings
+
+settings = get_settings()
+
+class CachedPrincipal(NamedTuple):
+    claims: Dict[str, Any]
+    user: UserInDB
+    expires_at: float  # time.monotonic() deadline
+
+class PrincipalCache(IPrincipalCache):
+    """In-process LRU of verified bearer tokens and the users they resolve to.
+
+    Entries are keyed by a SHA-256 of the token, so raw tokens are never
+    held, and expire at the token's `exp` or after `ttl_seconds`, whichever
+    comes first. With USER_CACHE_ENABLED, the UserCache invalidation
+    listener also drops the entries of users changed by other processes.
+    Without it, only the TTL bounds how long a process may serve a user
+    changed elsewhere.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None, max_size: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.AUTH_CACHE_TTL_SECONDS
+        self.max_size = max_size or settings.AUTH_CACHE_MAX_SIZE
+        self._entries: "OrderedDict[str, CachedPrincipal]" = OrderedDict()
+        # user_id -> token hashes cached for that user
+        self._user_keys: Dict[int, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[CachedPrincipal]:
+        """Return the cached principal for a token, if present and not expired."""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._discard(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, token: str, claims: Dict[str, Any], user: UserInDB) -> None:
+        """Cache a verified token until its expiry or the TTL, whichever is sooner."""
+        if self.ttl_seconds <= 0:
+            return
+        lifetime = float(self.ttl_seconds)
+        exp = claims.get("exp")
+        if exp is not None:
+            lifetime = min(lifetime, float(exp) - time.time())
+        if lifetime <= 0:
+            return
+
+        key = self._key(token)
+        self._discard(key)
+        self._entries[key] = CachedPrincipal(claims, user, time.monotonic() + lifetime)
+        self._user_keys.setdefault(user.id, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached token of a user (after it was updated or deleted)."""
+        for key in list(self._user_keys.get(user_id, ())):
+            self._discard(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._user_keys.clear()
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._user_keys.get(entry.user.id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[entry.user.id]
+
+# Singleton instance
+principal_cache = PrincipalCache()
@@ -0,0 +1,245 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
+import asyncio
+import json
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities.user import UserInDB
+from app.domain.interfaces.repositories.user_repository import IUserRepository
+from app.infrastructure.cache.principal_cache import principal_cache
+from app.infrastructure.config import get_settings
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.database.routing import read_your_writes
+from app.infrastructure.redis.redis_client import RedisClient
+from app.infrastructure.repositories.user_repository import UserRepository
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "user:"
+INVALIDATION_CHANNEL = "user:invalidate"
+# Password hashes never enter the cache; cached users carry this instead
+REDACTED_PASSWORD = ""
+
+class UserCache:
+    """Two-tier read-through cache of UserInDB records.
+
+    Tier one is an in-process LRU with a short TTL; tier two is Redis,
+    shared by every process, with a longer TTL. Users are cached under
+    both their id and their email, without their password hash, so
+    nothing that checks credentials may read through it. Concurrent misses
+    for the same key share a single load, which runs in a session of the
+    cache's own (from `session_factory`) rather than in any one caller's.
+    Invalidations delete the Redis entries and are published so that
+    every process drops its local copies (and any cached bearer tokens of
+    that user).
+    """
+
+    def __init__(
+        self,
+        local_ttl_seconds: Optional[int] = None,
+        local_max_size: Optional[int] = None,
+        redis_ttl_seconds: Optional[int] = None,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        repository_factory: Optional[Callable[[AsyncSession], IUserRepository]] = None,
+    ):
+        self.local_ttl = local_ttl_seconds or settings.USER_CACHE_LOCAL_TTL_SECONDS
+        self.local_max_size = local_max_size or settings.USER_CACHE_LOCAL_MAX_SIZE
+        self.redis_ttl = redis_ttl_seconds or settings.USER_CACHE_TTL_SECONDS
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.repository_factory = repository_factory or UserRepository
+        self.node_id = uuid4().hex
+        # key -> (expires_at, user)
+        self._local: "OrderedDict[str, Tuple[float, UserInDB]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._listener_task: Optional[asyncio.Task] = None
+        self._pubsub = None
+        # Counters
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def id_key(user_id: int) -> str:
+        return f"id:{user_id}"
+
+    @staticmethod
+    def email_key(email: str) -> str:
+        return f"email:{email.lower()}"
+
+    async def get(
+        self,
+        key: str,
+        fetch: Callable[[IUserRepository], Awaitable[Optional[UserInDB]]]
+    ) -> Optional[UserInDB]:
+        """Return the user cached under `key`, reading it with `fetch(repository)` on a miss."""
+        user = self._get_local(key)
+        if user is not None:
+            self.local_hits += 1
+            return user
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _load(
+        self,
+        key: str,
+        fetch: Callable[[IUserRepository], Awaitable[Optional[UserInDB]]]
+    ) -> Optional[UserInDB]:
+        user = await self._get_remote(key)
+        if user is not None:
+            self.redis_hits += 1
+        else:
+            self.misses += 1
+            # Waiters share this load, so it must not borrow any request's session
+            async with self.session_factory() as db:
+                user = await fetch(self.repository_factory(db))
+            if user is None:
+                return None
+            user = user.model_copy(update={"hashed_password": REDACTED_PASSWORD})
+            await self._set_remote(user)
+        self._set_local(user)
+        return user
+
+    async def invalidate_user(self, user_id: int, emails: Iterable[str] = ()) -> None:
+        """Forget a user everywhere: locally, in Redis, and in the other processes."""
+        emails = {email.lower() for email in emails if email}
+        cached = self._get_local(self.id_key(user_id)) or await self._get_remote(self.id_key(user_id))
+        if cached is not None:
+            emails.add(cached.email.lower())
+        await self._invalidate([user_id], emails)
+
+    async def invalidate_emails(self, emails: Iterable[str]) -> None:
+        """Forget users known only by email (e.g. after a bulk upsert)."""
+        emails = {email.lower() for email in emails if email}
+        if not emails:
+            return
+        user_ids = set()
+        for email in emails:
+            entry = self._local.get(self.email_key(email))
+            if entry is not None:
+                user_ids.add(entry[1].id)
+        try:
+            redis_client = await RedisClient.get_redis()
+            payloads = await redis_client.mget([REDIS_KEY_PREFIX + self.email_key(email) for email in emails])
+            user_ids.update(json.loads(payload)["id"] for payload in payloads if payload)
+        except Exception as e:
+            logger.error(f"User cache read failed: {e}")
+        await self._invalidate(sorted(user_ids), emails)
+
+    async def _invalidate(self, user_ids: List[int], emails: Iterable[str]) -> None:
+        emails = sorted(emails)
+        self._drop_local(user_ids, emails)
+        keys = [REDIS_KEY_PREFIX + self.id_key(user_id) for user_id in user_ids]
+        keys += [REDIS_KEY_PREFIX + self.email_key(email) for email in emails]
+        try:
+            redis_client = await RedisClient.get_redis()
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                pipe.publish(INVALIDATION_CHANNEL, json.dumps({
+                    "origin": self.node_id,
+                    "ids": user_ids,
+                    "emails": emails,
+                }))
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to invalidate cached users {user_ids}: {e}")
+
+    def _get_local(self, key: str) -> Optional[UserInDB]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return user
+
+    def _set_local(self, user: UserInDB) -> None:
+        expires_at = time.monotonic() + self.local_ttl
+        for key in (self.id_key(user.id), self.email_key(user.email)):
+            self._local[key] = (expires_at, user)
+            self._local.move_to_end(key)
+        while len(self._local) > self.local_max_size:
+            self._local.popitem(last=False)
+
+    def _drop_local(self, user_ids: Iterable[int], emails: Iterable[str]) -> None:
+        for user_id in user_ids:
+            self._local.pop(self.id_key(user_id), None)
+        for email in emails:
+            self._local.pop(self.email_key(email), None)
+
+    async def _get_remote(self, key: str) -> Optional[UserInDB]:
+        try:
+            redis_client = await RedisClient.get_redis()
+            payload = await redis_client.get(REDIS_KEY_PREFIX + key)
+        except Exception as e:
+            logger.error(f"User cache read failed: {e}")
+            return None
+        if not payload:
+            return None
+        return UserInDB.model_validate({**json.loads(payload), "hashed_password": REDACTED_PASSWORD})
+
+    async def _set_remote(self, user: UserInDB) -> None:
+        payload = user.model_dump_json(exclude={"hashed_password"}, exclude_none=True)
+        try:
+            redis_client = await RedisClient.get_redis()
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.set(REDIS_KEY_PREFIX + self.id_key(user.id), payload, ex=self.redis_ttl)
+                pipe.set(REDIS_KEY_PREFIX + self.email_key(user.email), payload, ex=self.redis_ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"User cache write failed: {e}")
+
+    async def start(self) -> None:
+        """Start listening for invalidations published by other processes."""
+        redis_client = await RedisClient.get_redis()
+        self._pubsub = redis_client.pubsub()
+        await self._pubsub.subscribe(INVALIDATION_CHANNEL)
+        self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        if self._pubsub is not None:
+            await self._pubsub.close()
+            self._pubsub = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None or message.get("type") != "message":
+                    continue
+                event = json.loads(message["data"])
+                if event.get("origin") == self.node_id:
+                    continue
+                self._drop_local(event["ids"], event["emails"])
+                # Another process wrote these users; don't read them back from a lagging replica
+                read_your_writes.mark(
+                    *(self.id_key(user_id) for user_id in event["ids"]),
+                    *(self.email_key(email) for email in event["emails"])
+                )
+                for user_id in event["ids"]:
+                    principal_cache.invalidate_user(user_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"User cache invalidation listener error: {e}")
+                await asyncio.sleep(1)
+
+# Singleton instance
+user_cache = UserCache()
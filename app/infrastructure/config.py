@@ -1,6 +1,6 @@
 import os
 from functools import lru_cache
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, PostgresDsn, validator
 
@@ -23,18 +23,82 @@ class Settings(BaseSettings):
     DB_MAX_OVERFLOW: int = 10
     DB_POOL_RECYCLE: int = 3600
     DB_CONNECT_TIMEOUT: int = 30
+    DATABASE_REPLICA_URLS: str = ""  # comma-separated async URLs of read replicas
+    DB_READ_YOUR_WRITES_SECONDS: int = 5
+    DB_ECHO: bool = False
+    DB_SLOW_QUERY_MS: int = 200
+    DB_SLOW_QUERY_SAMPLE_RATE: float = 1.0
+    DB_N_PLUS_ONE_THRESHOLD: int = 10
     
     # Redis
     REDIS_URL: str
+    REDIS_MAX_CONNECTIONS: int = 100
+    REDIS_POOL_TIMEOUT: float = 5.0  # seconds to wait for a free connection
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 2.0
+    REDIS_HIREDIS: bool = True  # parse replies with hiredis when it is installed
+    REDIS_BATCH_SIZE: int = 500  # keys or commands per round trip in batch helpers
+    
+    # User cache
+    USER_CACHE_ENABLED: bool = False
+    USER_CACHE_TTL_SECONDS: int = 300
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 30
+    USER_CACHE_LOCAL_MAX_SIZE: int = 10000
     
     # Kafka
     KAFKA_BOOTSTRAP_SERVERS: str
     KAFKA_TOPIC: str = "fastapi_events"
+    KAFKA_CONSUMER_GROUP: str = "fastapi_clean"
+    KAFKA_CONSUMER_BATCH_SIZE: int = 500
+    KAFKA_CONSUMER_BATCH_TIMEOUT_MS: int = 100
+    KAFKA_CONSUMER_ENABLED: bool = False  # run the consumer service inside the API process
+    KAFKA_CONSUMER_CONCURRENCY: int = 8
+    KAFKA_CONSUMER_MAX_IN_FLIGHT: int = 1000
+    KAFKA_CONSUMER_MAX_RETRIES: int = 5  # per failing handler call, before its records are skipped
+    KAFKA_CONSUMER_RETRY_BACKOFF_MS: int = 200  # doubled after every failed attempt
+    KAFKA_PRODUCER_BATCH_SIZE: int = 65536  # bytes per partition batch
+    KAFKA_PRODUCER_LINGER_MS: int = 5
+    KAFKA_PRODUCER_COMPRESSION: str = ""  # "" | gzip | snappy | lz4 | zstd
+    
+    # Domain events
+    EVENTS_ENABLED: bool = False
+    EVENTS_BUFFER_SIZE: int = 10000
     
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_TTL_SECONDS: int = 60  # 0 disables the verified-token cache
+    AUTH_CACHE_MAX_SIZE: int = 10000
+    
+    # Password hashing
+    PASSWORD_HASH_WORKERS: int = 2  # 0 hashes inline on the event loop
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 16
+    PASSWORD_HASH_QUEUE_TIMEOUT_MS: int = 5000
+    
+    # WebSocket
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_OVERFLOW_POLICY: str = "drop_oldest"  # drop_oldest | coalesce | disconnect
+    WS_BACKPLANE: str = "none"  # none | redis
+    WS_BATCH_WINDOW_MS: int = 0  # 0 disables per-room batching
+    WS_BATCH_MAX_EVENTS: int = 50
+    
+    # Chat
+    CHAT_REPOSITORY: str = "memory"  # memory | redis
+    CHAT_HISTORY_MAX_LEN: int = 1000
+    CHAT_PRESENCE_SNAPSHOT_LIMIT: int = 500
+    CHAT_WRITE_BEHIND: bool = False
+    CHAT_WRITE_BEHIND_BATCH_SIZE: int = 100
+    CHAT_WRITE_BEHIND_FLUSH_MS: int = 50
+    CHAT_WRITE_BEHIND_MAX_PENDING: int = 10000
+    CHAT_WRITE_BEHIND_MAX_RETRIES: int = 5
+    CHAT_WRITE_BEHIND_RETRY_BACKOFF_MS: int = 100  # doubled after every failed attempt
+    CHAT_LOG_ENABLED: bool = False  # durable Kafka log behind the in-memory repository
+    CHAT_LOG_TOPIC: str = "chat_log"
+    CHAT_LOG_REPLAY_MAX_RECORDS: int = 100000  # per partition
+    CHAT_LOG_REPLAY_TIMEOUT_SECONDS: int = 30
+    CHAT_LOG_SNAPSHOT_PER_ROOM: int = 200
     
     @validator("DATABASE_URL", pre=True)
     def assemble_db_connection(cls, v: Optional[str], values: dict) -> str:
@@ -43,6 +107,10 @@ class Settings(BaseSettings):
         # You can add logic here to construct the URL from parts if needed
         return v
     
+    @property
+    def replica_urls(self) -> List[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+    
     @property
     def is_testing(self) -> bool:
         return self.ENVIRONMENT.lower() == "testing"
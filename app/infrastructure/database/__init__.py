@@ -1,11 +1,13 @@
 import os
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Awaitable, Callable
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, make_url, text
 from sqlalchemy.exc import OperationalError
 from app.infrastructure.config import get_settings
+from app.infrastructure.database.instrumentation import query_metrics
+from app.infrastructure.database.routing import RoutingSession, WROTE
 import asyncio
 import time
 
@@ -17,21 +19,45 @@ DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
 DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '3600'))
 DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', '30'))
 
+def engine_options(url: str) -> dict:
+    """Pooling and timeout options for `url`.
+    
+    SQLite (local runs and benchmarks) is a file, not a server: it keeps
+    SQLAlchemy's default pool and rejects a connect timeout.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return dict(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        connect_args={"connect_timeout": DB_CONNECT_TIMEOUT}
+    )
+
 # Async engine with connection pooling
 async_engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=True,
-    pool_size=DB_POOL_SIZE,
-    max_overflow=DB_MAX_OVERFLOW,
-    pool_recycle=DB_POOL_RECYCLE,
-    pool_pre_ping=True,
-    connect_args={"connect_timeout": DB_CONNECT_TIMEOUT}
+    echo=settings.DB_ECHO,
+    **engine_options(settings.DATABASE_URL)
 )
 
+# Read replicas; plain SELECTs are spread over them round-robin
+replica_engines = [
+    create_async_engine(url, **engine_options(url))
+    for url in settings.replica_urls
+]
+RoutingSession.configure(async_engine, replica_engines)
+
+# Statement latency histograms and per-request query counts
+for engine in (async_engine, *replica_engines):
+    query_metrics.instrument(engine)
+
 # Async session factory
 AsyncSessionLocal = async_sessionmaker(
     bind=async_engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
     autoflush=False,
     autocommit=False
@@ -40,23 +66,32 @@ AsyncSessionLocal = async_sessionmaker(
 # Sync engine for migrations
 sync_engine = create_engine(
     settings.DATABASE_SYNC_URL,
-    pool_size=DB_POOL_SIZE,
-    max_overflow=DB_MAX_OVERFLOW,
-    pool_recycle=DB_POOL_RECYCLE,
-    pool_pre_ping=True,
-    connect_args={"connect_timeout": DB_CONNECT_TIMEOUT}
+    **engine_options(settings.DATABASE_SYNC_URL)
 )
 
 SyncSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
 
 Base = declarative_base()
 
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Run `callback` once get_db has committed the session's transaction."""
+    session.info.setdefault("after_commit", []).append(callback)
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Dependency for getting async DB session"""
+    """Dependency for getting async DB session
+    
+    The request owns the transaction: repositories never commit, and the
+    session is committed once here, only if it wrote something. The
+    connection is checked out on the first statement, and read-only
+    requests just hand it back without a COMMIT round trip.
+    """
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            if session.info.get(WROTE):
+                await session.commit()
+                for callback in session.info.pop("after_commit", []):
+                    await callback()
         except Exception as e:
             await session.rollback()
             raise e
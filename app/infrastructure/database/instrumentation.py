@@ -0,0 +1,173 @@
+from bisect import bisect_left
+from collections import Counter, deque
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional
+import logging
+import random
+import re
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.infrastructure.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Statement latency buckets, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Distinct statements tracked before the rest are folded into "other"
+MAX_STATEMENTS = 500
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%s|%\(\w+\)s|:\w+|\$\d+|\?")
+_PLACEHOLDER_LISTS = re.compile(r"\(\?(?:, \?)*\)")
+_REPEATED_ROWS = re.compile(r"\(\?\)(?:, \(\?\))+")
+
+@lru_cache(maxsize=2048)
+def normalize_sql(statement: str) -> str:
+    """Reduce a statement to its shape: literals, placeholders and IN/VALUES lists become `?`."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _LITERALS.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _PLACEHOLDER_LISTS.sub("(?)", sql)
+    sql = _REPEATED_ROWS.sub("(?)", sql)
+    return sql[:200]
+
+def redact_parameters(parameters: Any) -> Any:
+    """Keep the shape of bound parameters, never their values."""
+    if isinstance(parameters, dict):
+        return {key: "?" for key in parameters}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"<{len(parameters)} parameter sets>"
+        return ["?"] * len(parameters)
+    return "?"
+
+class Histogram:
+    """Cumulative latency histogram in the Prometheus sense."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class RequestQueryStats:
+    """Queries issued while serving one request."""
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Statements run at least `threshold` times: likely N+1 patterns."""
+        return {sql: n for sql, n in self.statements.items() if n >= threshold}
+
+_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+def start_request() -> RequestQueryStats:
+    """Start counting the queries of the current request (or task)."""
+    stats = RequestQueryStats()
+    _request_stats.set(stats)
+    return stats
+
+class QueryMetrics:
+    """Latency histograms per normalized statement, plus sampled slow queries."""
+
+    def __init__(
+        self,
+        slow_query_ms: Optional[int] = None,
+        slow_query_sample_rate: Optional[float] = None,
+    ):
+        self.slow_query_seconds = (slow_query_ms if slow_query_ms is not None else settings.DB_SLOW_QUERY_MS) / 1000
+        if slow_query_sample_rate is None:
+            slow_query_sample_rate = settings.DB_SLOW_QUERY_SAMPLE_RATE
+        self.slow_query_sample_rate = slow_query_sample_rate
+        self.histograms: Dict[str, Histogram] = {}
+        self.errors: Counter = Counter()
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=100)
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """Attach the timing hooks to an engine."""
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        sql = normalize_sql(statement)
+        histogram = self.histograms.get(sql)
+        if histogram is None:
+            if len(self.histograms) >= MAX_STATEMENTS:
+                sql = "other"
+            histogram = self.histograms.setdefault(sql, Histogram())
+        histogram.observe(elapsed)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+            stats.statements[sql] += 1
+
+        if elapsed >= self.slow_query_seconds and random.random() < self.slow_query_sample_rate:
+            sample = {
+                "statement": sql,
+                "parameters": redact_parameters(parameters),
+                "duration_ms": round(elapsed * 1000, 1),
+                "at": time.time(),
+            }
+            self.slow_queries.append(sample)
+            logger.warning(f"Slow query ({sample['duration_ms']} ms): {sql} params={sample['parameters']}")
+
+    def _handle_error(self, exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+        if exception_context.statement is not None:
+            self.errors[normalize_sql(exception_context.statement)] += 1
+
+    def render_prometheus(self) -> List[str]:
+        """Render the histograms in the Prometheus text exposition format."""
+        lines = [
+            "# HELP db_query_duration_seconds Database statement latency by normalized statement.",
+            "# TYPE db_query_duration_seconds histogram",
+        ]
+        for sql, histogram in self.histograms.items():
+            label = _escape(sql)
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.counts):
+                cumulative += count
+                lines.append(f'db_query_duration_seconds_bucket{{statement="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'db_query_duration_seconds_bucket{{statement="{label}",le="+Inf"}} {histogram.count}')
+            lines.append(f'db_query_duration_seconds_sum{{statement="{label}"}} {histogram.sum}')
+            lines.append(f'db_query_duration_seconds_count{{statement="{label}"}} {histogram.count}')
+        lines += [
+            "# HELP db_query_errors_total Failed database statements by normalized statement.",
+            "# TYPE db_query_errors_total counter",
+        ]
+        for sql, count in self.errors.items():
+            lines.append(f'db_query_errors_total{{statement="{_escape(sql)}"}} {count}')
+        return lines
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Singleton instance
+query_metrics = QueryMetrics()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, func
+from sqlalchemy import Column, Index, Integer, String, Boolean, DateTime, false, func
 from sqlalchemy.orm import relationship
 from app.infrastructure.database import Base
 
@@ -11,8 +11,15 @@ class User(Base):
     full_name = Column(String(100), nullable=True)
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
+    is_superuser = Column(Boolean, default=False, server_default=false(), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __table_args__ = (
+        # Keyset pagination of GET /users, filtered by status or creation date
+        Index("ix_users_is_active_id", "is_active", "id"),
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
+    
     # Relationships
     # items = relationship("Item", back_populates="owner")
@@ -0,0 +1,90 @@
+from itertools import cycle
+from typing import Any, Dict, Iterator, List, Optional
+import time
+
+from sqlalchemy import Select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.infrastructure.config import get_settings
+
+settings = get_settings()
+
+# Execution option that pins a SELECT to the primary
+USE_PRIMARY = "use_primary"
+# Session.info flag set once a session has issued anything but a SELECT
+WROTE = "wrote"
+
+class RoutingSession(Session):
+    """Session that sends plain SELECTs to a read replica and everything else to the primary.
+
+    Each session sticks to one replica, picked round-robin, so a request
+    sees a consistent snapshot. Once a session writes, it stays on the
+    primary so it can read its own changes, and is flagged in
+    `info[WROTE]` so read-only sessions can skip their commit. A statement
+    can also be pinned to the primary with
+    `.execution_options(use_primary=True)` or, for cached lambda
+    statements, `bind_arguments={"use_primary": True}`. Without replicas
+    every statement goes to the primary.
+    """
+
+    primary: Optional[Engine] = None
+    replicas: Optional[Iterator[Engine]] = None
+
+    @classmethod
+    def configure(cls, primary: AsyncEngine, replicas: List[AsyncEngine]) -> None:
+        cls.primary = primary.sync_engine
+        cls.replicas = cycle([replica.sync_engine for replica in replicas]) if replicas else None
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        # Lambda statements proxy `is_select` to the statement they build
+        is_select = getattr(clause, "is_select", False)
+        if (
+            self.replicas is not None
+            and is_select
+            and not self._flushing
+            and not kw.get(USE_PRIMARY)
+            and not self.info.get(USE_PRIMARY)
+            and not (isinstance(clause, Select) and clause.get_execution_options().get(USE_PRIMARY))
+        ):
+            replica = self.info.get("replica")
+            if replica is None:
+                replica = self.info["replica"] = next(self.replicas)
+            return replica
+        if self._flushing or (clause is not None and not is_select):
+            # Keep reading from the primary after a write
+            self.info[USE_PRIMARY] = True
+            self.info[WROTE] = True
+        return self.primary
+
+class ReadYourWrites:
+    """Remembers recently written records so their reads skip the lagging replicas."""
+
+    def __init__(self, window_seconds: Optional[int] = None):
+        self.window = window_seconds if window_seconds is not None else settings.DB_READ_YOUR_WRITES_SECONDS
+        self._until: Dict[str, float] = {}
+
+    def mark(self, *keys: str) -> None:
+        """Route reads of `keys` to the primary for the next `window` seconds."""
+        now = time.monotonic()
+        if len(self._until) > 10000:
+            self._until = {key: until for key, until in self._until.items() if until > now}
+        for key in keys:
+            self._until[key] = now + self.window
+
+    def is_recent(self, key: str) -> bool:
+        until = self._until.get(key)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            del self._until[key]
+            return False
+        return True
+
+    def bind_arguments(self, key: str) -> Dict[str, Any]:
+        """`bind_arguments` for Session.execute that pin a read of `key` to the primary if it was just written."""
+        return {USE_PRIMARY: True} if self.is_recent(key) else {}
+
+# Singleton instance
+read_your_writes = ReadYourWrites()
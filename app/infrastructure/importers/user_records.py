@@ -0,0 +1,67 @@
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Tuple, Union
+import csv
+import json
+
+# Parsers for bulk user imports. Input arrives as a stream of byte chunks
+# (an HTTP request body or a file) and is decoded line by line, so memory
+# use does not grow with the size of the import. Each record is yielded
+# with its 1-based line number; a line that cannot be decoded is yielded
+# as a ValueError so the import can report it and carry on.
+
+UserRecord = Tuple[int, Union[Dict[str, Any], ValueError]]
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a stream of byte chunks into decoded lines."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8")
+    if buffer:
+        yield buffer.rstrip(b"\r").decode("utf-8")
+
+async def iter_ndjson_records(chunks: AsyncIterable[bytes]) -> AsyncIterator[UserRecord]:
+    """Yield one record per non-empty NDJSON line."""
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, ValueError(f"Invalid JSON: {e.msg}")
+            continue
+        if not isinstance(record, dict):
+            yield line_no, ValueError("Expected a JSON object")
+            continue
+        yield line_no, record
+
+async def iter_csv_records(chunks: AsyncIterable[bytes]) -> AsyncIterator[UserRecord]:
+    """Yield one record per CSV row, keyed by the header row.
+    
+    Empty cells are treated as missing. Quoted fields may not span lines.
+    """
+    header = None
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield line_no, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        yield line_no, {name: value for name, value in zip(header, values) if value != ""}
+
+def iter_user_records(chunks: AsyncIterable[bytes], format: str) -> AsyncIterator[UserRecord]:
+    """Pick the parser for `format` ("csv" or "ndjson")."""
+    if format == "csv":
+        return iter_csv_records(chunks)
+    if format == "ndjson":
+        return iter_ndjson_records(chunks)
+    raise ValueError(f"Unsupported import format: {format}")
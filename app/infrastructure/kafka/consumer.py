@@ -1,28 +1,70 @@
-from aiokafka import AIOKafkaConsumer
-import json
-import asyncio
+from typing import Dict, List, Optional
+import logging
+
+from aiokafka import AIOKafkaConsumer, ConsumerRecord, TopicPartition
 from app.infrastructure.config import get_settings
 from app.infrastructure.redis.redis_client import RedisClient
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+def message_key(topic: str, partition: int, offset: int) -> str:
+    """Redis key of a consumed record; offsets are only unique within a partition."""
+    return f"kafka_msg:{topic}:{partition}:{offset}"
+
+async def write_batch(records: List[ConsumerRecord]) -> None:
+    """Store a batch of records in pipelined round trips.
+
+    Values are already JSON, so they are stored as received instead of
+    being decoded and re-encoded.
+    """
+    await RedisClient.mset({
+        message_key(record.topic, record.partition, record.offset): record.value
+        for record in records
+    })
 
-async def consume():
+async def mirror_to_redis(records: List[ConsumerRecord]) -> None:
+    """ConsumerService handler copying events into Redis, as consume() does."""
+    await write_batch(records)
+
+async def consume(batch_size: Optional[int] = None, timeout_ms: Optional[int] = None):
+    """Consume the events topic in batches, copying each record into Redis.
+
+    Each `getmany` call returns up to `batch_size` records, waiting at
+    most `timeout_ms` for them. The batch is written with MSETs of
+    REDIS_BATCH_SIZE keys, and its offsets are committed only once that
+    write succeeded. A crash in between redelivers the batch, and re-writing
+    the same keys is harmless.
+    """
+    batch_size = batch_size or settings.KAFKA_CONSUMER_BATCH_SIZE
+    timeout_ms = timeout_ms if timeout_ms is not None else settings.KAFKA_CONSUMER_BATCH_TIMEOUT_MS
     consumer = AIOKafkaConsumer(
         settings.KAFKA_TOPIC,
         bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
-        value_deserializer=lambda m: json.loads(m.decode('utf-8'))
+        group_id=settings.KAFKA_CONSUMER_GROUP,
+        enable_auto_commit=False,
+        max_poll_records=batch_size
     )
-    
+
     await consumer.start()
     try:
-        async for msg in consumer:
-            print(f"Consumed message: {msg.value}")
-            # Here you can add your message processing logic
-            # Example: Update Redis cache
-            redis_client = await RedisClient.get_redis()
-            await redis_client.set(f"kafka_msg_{msg.offset}", json.dumps(msg.value))
+        while True:
+            batches: Dict[TopicPartition, List[ConsumerRecord]] = await consumer.getmany(
+                timeout_ms=timeout_ms,
+                max_records=batch_size
+            )
+            if not batches:
+                continue
+            records = [record for partition_records in batches.values() for record in partition_records]
+            await write_batch(records)
+            await consumer.commit({
+                partition: partition_records[-1].offset + 1
+                for partition, partition_records in batches.items()
+            })
+            logger.debug(f"Consumed {len(records)} records from {len(batches)} partitions")
     except Exception as e:
-        print(f"Error consuming message: {e}")
+        logger.error(f"Error consuming messages: {e}")
+        raise
     finally:
         await consumer.stop()
 
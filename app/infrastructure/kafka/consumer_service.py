@@ -0,0 +1,256 @@
+from collections import deque
+from itertools import groupby
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import zlib
+
+from aiokafka import AIOKafkaConsumer, ConsumerRebalanceListener, ConsumerRecord, TopicPartition
+from aiokafka.errors import KafkaError
+from app.infrastructure.config import get_settings
+from app.infrastructure.kafka.consumer import mirror_to_redis
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Handles a run of records from one topic, oldest first
+Handler = Callable[[List[ConsumerRecord]], Awaitable[None]]
+
+class PartitionProgress:
+    """Offsets of one partition handed to the lanes, and how far it is safe to commit.
+
+    Lanes finish records out of order, so the committable offset only
+    moves past a record once every earlier record of the partition is
+    done as well.
+    """
+
+    def __init__(self):
+        self.pending: Deque[int] = deque()
+        self.done: Set[int] = set()
+        self.committable: Optional[int] = None
+        self.committed: Optional[int] = None
+
+    @property
+    def idle(self) -> bool:
+        return not self.pending
+
+    def add(self, offset: int) -> None:
+        self.pending.append(offset)
+
+    def complete(self, offset: int) -> None:
+        self.done.add(offset)
+        while self.pending and self.pending[0] in self.done:
+            head = self.pending.popleft()
+            self.done.discard(head)
+            self.committable = head + 1
+
+class _RebalanceListener(ConsumerRebalanceListener):
+    def __init__(self, service: "ConsumerService"):
+        self.service = service
+
+    async def on_partitions_revoked(self, revoked):
+        await self.service._release(revoked)
+
+    async def on_partitions_assigned(self, assigned):
+        logger.info(f"Assigned partitions: {sorted(str(tp) for tp in assigned)}")
+
+class ConsumerService:
+    """Managed Kafka consumer that runs handlers concurrently across partitions and keys.
+
+    Handlers are registered per topic. Fetched records are spread over
+    `concurrency` lanes by partition and key: a lane handles its records
+    one run at a time, so records with the same key stay in order while
+    different keys and partitions proceed in parallel. A slow handler
+    only holds up its own lane.
+
+    At most `max_in_flight` records are fetched but unfinished. Beyond
+    that, fetching is paused until half of them are done. Offsets are
+    committed manually, up to the oldest unfinished record of each
+    partition. When partitions are revoked, their in-flight records are
+    finished and committed first, so the new owner resumes where this
+    process stopped. To use every core, run one service per process in
+    the same consumer group (see scripts/run_consumer.py).
+
+    A handler that raises is retried up to `max_retries` times, waiting
+    `retry_backoff_ms` and then twice as long each time, so handlers must
+    be idempotent. The lane waits meanwhile, so nothing is committed past
+    the failing records. Only once the retries are spent are the records
+    logged and skipped, so one bad record cannot stall its partition for
+    good.
+    """
+
+    def __init__(
+        self,
+        group_id: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        timeout_ms: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff_ms: Optional[int] = None
+    ):
+        self.group_id = group_id or settings.KAFKA_CONSUMER_GROUP
+        self.concurrency = concurrency or settings.KAFKA_CONSUMER_CONCURRENCY
+        self.max_in_flight = max_in_flight or settings.KAFKA_CONSUMER_MAX_IN_FLIGHT
+        self.batch_size = batch_size or settings.KAFKA_CONSUMER_BATCH_SIZE
+        self.timeout_ms = timeout_ms if timeout_ms is not None else settings.KAFKA_CONSUMER_BATCH_TIMEOUT_MS
+        self.max_retries = max_retries if max_retries is not None else settings.KAFKA_CONSUMER_MAX_RETRIES
+        self.retry_backoff = (retry_backoff_ms or settings.KAFKA_CONSUMER_RETRY_BACKOFF_MS) / 1000
+        self.handlers: Dict[str, Handler] = {}
+        self._consumer: Optional[AIOKafkaConsumer] = None
+        self._lanes: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self._fetcher: Optional[asyncio.Task] = None
+        self._progress: Dict[TopicPartition, PartitionProgress] = {}
+        self._in_flight = 0
+        self._capacity = asyncio.Event()
+        self._finished = asyncio.Condition()
+        # Counters
+        self.retries = 0
+        self.skipped = 0
+
+    def register(self, topic: str, handler: Optional[Handler] = None):
+        """Handle `topic` with `handler`; also usable as a decorator."""
+        def decorator(handler: Handler) -> Handler:
+            self.handlers[topic] = handler
+            return handler
+        return decorator(handler) if handler is not None else decorator
+
+    async def start(self) -> None:
+        if self._consumer is not None:
+            return
+        if not self.handlers:
+            raise ValueError("No Kafka handlers registered")
+        self._consumer = AIOKafkaConsumer(
+            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+            group_id=self.group_id,
+            enable_auto_commit=False,
+            max_poll_records=self.batch_size
+        )
+        self._consumer.subscribe(list(self.handlers), listener=_RebalanceListener(self))
+        await self._consumer.start()
+        self._capacity.set()
+        self._lanes = [asyncio.Queue() for _ in range(self.concurrency)]
+        self._workers = [asyncio.create_task(self._run_lane(lane)) for lane in self._lanes]
+        self._fetcher = asyncio.create_task(self._fetch())
+        logger.info(f"Kafka consumer started on {sorted(self.handlers)} with {self.concurrency} lanes")
+
+    async def stop(self) -> None:
+        """Stop fetching, finish the records already fetched, commit and leave the group."""
+        if self._consumer is None:
+            return
+        self._fetcher.cancel()
+        await asyncio.gather(self._fetcher, return_exceptions=True)
+        await asyncio.gather(*(lane.join() for lane in self._lanes))
+        await self._commit()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        await self._consumer.stop()
+        self._consumer = None
+        self._progress.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": self._in_flight,
+            "partitions": len(self._progress),
+            "queued": sum(lane.qsize() for lane in self._lanes),
+            "retries": self.retries,
+            "skipped": self.skipped,
+        }
+
+    def _lane_for(self, record: ConsumerRecord) -> asyncio.Queue:
+        # Keyless records carry no ordering promise; spread them by offset
+        key = record.key if record.key is not None else str(record.offset).encode()
+        return self._lanes[zlib.crc32(key, record.partition) % len(self._lanes)]
+
+    async def _fetch(self) -> None:
+        consumer = self._consumer
+        while True:
+            if self._in_flight >= self.max_in_flight:
+                paused = consumer.assignment()
+                consumer.pause(*paused)
+                await self._capacity.wait()
+                consumer.resume(*(tp for tp in paused if tp in consumer.assignment()))
+            try:
+                batches = await consumer.getmany(timeout_ms=self.timeout_ms, max_records=self.batch_size)
+            except KafkaError as e:
+                logger.error(f"Error fetching Kafka records: {e}")
+                await asyncio.sleep(1)
+                continue
+            for tp, records in batches.items():
+                progress = self._progress.setdefault(tp, PartitionProgress())
+                for record in records:
+                    progress.add(record.offset)
+                    self._lane_for(record).put_nowait((tp, record))
+                self._in_flight += len(records)
+            if self._in_flight >= self.max_in_flight:
+                self._capacity.clear()
+            await self._commit()
+
+    async def _run_lane(self, lane: asyncio.Queue) -> None:
+        while True:
+            items: List[Tuple[TopicPartition, ConsumerRecord]] = [await lane.get()]
+            while len(items) < self.batch_size and not lane.empty():
+                items.append(lane.get_nowait())
+            for topic, run in groupby(items, key=lambda item: item[1].topic):
+                run = list(run)
+                await self._handle(topic, [record for _, record in run])
+                for tp, record in run:
+                    progress = self._progress.get(tp)
+                    if progress is not None:
+                        progress.complete(record.offset)
+            self._in_flight -= len(items)
+            if self._in_flight <= self.max_in_flight // 2:
+                self._capacity.set()
+            for _ in items:
+                lane.task_done()
+            async with self._finished:
+                self._finished.notify_all()
+
+    async def _handle(self, topic: str, records: List[ConsumerRecord]) -> None:
+        """Run the topic's handler, retrying with backoff before giving up on the records."""
+        backoff = self.retry_backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.handlers[topic](records)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.skipped += len(records)
+                    logger.exception(f"Kafka handler for {topic} failed {attempt + 1} times; skipping {len(records)} records")
+                    return
+                self.retries += 1
+                logger.warning(f"Kafka handler for {topic} failed, retrying in {backoff:.2f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff *= 2
+
+    async def _commit(self, partitions: Optional[List[TopicPartition]] = None) -> None:
+        offsets = {}
+        for tp in partitions if partitions is not None else list(self._progress):
+            progress = self._progress.get(tp)
+            if progress is not None and progress.committable is not None and progress.committable != progress.committed:
+                offsets[tp] = progress.committable
+        if not offsets:
+            return
+        try:
+            await self._consumer.commit(offsets)
+        except KafkaError as e:
+            # The records will be redelivered to whoever owns the partitions now
+            logger.warning(f"Kafka offset commit failed: {e}")
+            return
+        for tp, offset in offsets.items():
+            self._progress[tp].committed = offset
+
+    async def _release(self, revoked) -> None:
+        """Finish and commit the in-flight records of partitions this process is losing."""
+        revoked = [tp for tp in revoked if tp in self._progress]
+        async with self._finished:
+            await self._finished.wait_for(lambda: all(self._progress[tp].idle for tp in revoked))
+        await self._commit(revoked)
+        for tp in revoked:
+            del self._progress[tp]
+
+# Singleton instance
+consumer_service = ConsumerService()
+consumer_service.register(settings.KAFKA_TOPIC, mirror_to_redis)
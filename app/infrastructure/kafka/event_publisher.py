@@ -0,0 +1,146 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from app.domain.interfaces.events.event_publisher import IEventPublisher
+from app.infrastructure.config import get_settings
+from app.infrastructure.database.instrumentation import BUCKETS, Histogram
+from app.infrastructure.kafka.producer import KafkaProducer
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Event type, envelope, key, and time.perf_counter() when it was published
+_Event = Tuple[str, Dict[str, Any], Optional[bytes], float]
+
+class KafkaEventPublisher(IEventPublisher):
+    """Fire-and-forget publisher of domain events to Kafka.
+
+    `publish` only appends the event to a bounded in-memory buffer and
+    returns; a background task hands buffered events to the producer,
+    which batches, compresses and sends them. Encoding happens there too,
+    off the request path. When Kafka falls behind and the buffer is full,
+    new events are dropped and counted rather than slowing requests down.
+    Delivery latency (publish to broker acknowledgement), deliveries,
+    failures and drops are exported with the other metrics.
+    """
+
+    def __init__(self, topic: Optional[str] = None, buffer_size: Optional[int] = None):
+        self.topic = topic or settings.KAFKA_TOPIC
+        self.buffer_size = buffer_size or settings.EVENTS_BUFFER_SIZE
+        self._queue: Optional[asyncio.Queue] = None
+        self._sender: Optional[asyncio.Task] = None
+        self.latency = Histogram()
+        self.published = 0
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def publish(self, event_type: str, data: Dict[str, Any], key: Optional[str] = None) -> bool:
+        if self._queue is None:
+            self.dropped += 1
+            return False
+        envelope = {
+            "type": event_type,
+            "occurred_at": datetime.now(timezone.utc),
+            "data": data,
+        }
+        try:
+            self._queue.put_nowait((event_type, envelope, key.encode() if key is not None else None, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.published += 1
+        return True
+
+    async def start(self) -> None:
+        if self._sender is None:
+            self._queue = asyncio.Queue(maxsize=self.buffer_size)
+            self._sender = asyncio.create_task(self._send_events())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Hand what is buffered to the producer, for at most `timeout` seconds.
+        
+        The producer is shared, so it is closed separately, after every
+        publisher has stopped.
+        """
+        if self._sender is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self._queue.qsize()} undelivered events on shutdown")
+        self._sender.cancel()
+        await asyncio.gather(self._sender, return_exceptions=True)
+        self._sender = None
+        self._queue = None
+
+    async def _send_events(self) -> None:
+        producer = None
+        while producer is None:
+            try:
+                producer = await KafkaProducer.get_producer()
+            except Exception as e:
+                # Keep buffering (and eventually dropping) until Kafka is reachable
+                logger.error(f"Kafka producer unavailable: {e}")
+                await KafkaProducer.close()
+                await asyncio.sleep(5)
+
+        while True:
+            event_type, envelope, key, published_at = await self._queue.get()
+            try:
+                # Only waits when the producer's own batches are full
+                delivery = await producer.send(self.topic, envelope, key=key)
+                delivery.add_done_callback(lambda future, started=published_at: self._delivered(future, started))
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Could not publish {event_type} event: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _delivered(self, future: asyncio.Future, published_at: float) -> None:
+        if future.cancelled() or future.exception() is not None:
+            self.failed += 1
+            return
+        self.delivered += 1
+        self.latency.observe(time.perf_counter() - published_at)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "buffered": self._queue.qsize() if self._queue is not None else 0,
+            "published": self.published,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+    def render_prometheus(self) -> List[str]:
+        """Render the publisher metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP event_delivery_seconds Time from publishing a domain event to its acknowledgement by Kafka.",
+            "# TYPE event_delivery_seconds histogram",
+        ]
+        cumulative = 0
+        for bound, count in zip(BUCKETS, self.latency.counts):
+            cumulative += count
+            lines.append(f'event_delivery_seconds_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'event_delivery_seconds_bucket{{le="+Inf"}} {self.latency.count}')
+        lines.append(f"event_delivery_seconds_sum {self.latency.sum}")
+        lines.append(f"event_delivery_seconds_count {self.latency.count}")
+        lines += [
+            "# HELP events_total Domain events by outcome.",
+            "# TYPE events_total counter",
+        ]
+        for outcome in ("published", "delivered", "failed", "dropped"):
+            lines.append(f'events_total{{outcome="{outcome}"}} {getattr(self, outcome)}')
+        lines += [
+            "# HELP events_buffered Domain events waiting to be handed to Kafka.",
+            "# TYPE events_buffered gauge",
+            f"events_buffered {self._queue.qsize() if self._queue is not None else 0}",
+        ]
+        return lines
+
+# Singleton instance
+event_publisher = KafkaEventPublisher()
@@ -1,8 +1,49 @@
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+import asyncio
+import time
+
 import redis.asyncio as redis
+from redis.asyncio.connection import HIREDIS_AVAILABLE, BlockingConnectionPool, _AsyncHiredisParser, _AsyncRESP2Parser
+from redis.exceptions import ConnectionError
 from app.infrastructure.config import get_settings
 
 settings = get_settings()
 
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    """Connection pool that waits for a free connection instead of failing, and records the wait.
+
+    Once `max_connections` are checked out, callers queue for up to
+    `timeout` seconds. The time spent getting a connection (queueing
+    plus connecting, when a new one is opened) feeds the pool stats.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquired = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def get_connection(self, command_name, *keys, **options):
+        start = time.perf_counter()
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        except ConnectionError as e:
+            if isinstance(e.__cause__, asyncio.TimeoutError):
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.acquired += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
 class RedisClient:
     _instance = None
     _client = None
@@ -10,11 +51,20 @@ class RedisClient:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(RedisClient, cls).__new__(cls)
-            cls._client = redis.from_url(
+            pool = InstrumentedConnectionPool.from_url(
                 settings.REDIS_URL,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                timeout=settings.REDIS_POOL_TIMEOUT,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+                socket_keepalive=True,
+                # hiredis parses replies in C when it is installed
+                parser_class=_AsyncHiredisParser if settings.REDIS_HIREDIS and HIREDIS_AVAILABLE else _AsyncRESP2Parser,
                 encoding="utf-8",
                 decode_responses=True
             )
+            cls._client = redis.Redis.from_pool(pool)
         return cls._instance
 
     @classmethod
@@ -30,6 +80,83 @@ class RedisClient:
             cls._client = None
             cls._instance = None
 
+    @classmethod
+    async def execute_many(cls, commands: Iterable[Tuple], chunk_size: Optional[int] = None) -> List[Any]:
+        """Run `(command, *args)` tuples, e.g. `("set", key, value)`, and return their replies.
+
+        Commands are sent in non-transactional pipelines of `chunk_size`,
+        one round trip each, so any number of them can be batched without
+        building one huge request or reply.
+        """
+        client = await cls.get_redis()
+        results: List[Any] = []
+        for chunk in _chunks(commands, chunk_size or settings.REDIS_BATCH_SIZE):
+            pipe = client.pipeline(transaction=False)
+            for name, *args in chunk:
+                getattr(pipe, name)(*args)
+            results.extend(await pipe.execute())
+        return results
+
+    @classmethod
+    async def mget(cls, keys: Sequence[str], chunk_size: Optional[int] = None) -> List[Optional[str]]:
+        """MGET any number of keys, `chunk_size` keys per round trip."""
+        client = await cls.get_redis()
+        values: List[Optional[str]] = []
+        for chunk in _chunks(keys, chunk_size or settings.REDIS_BATCH_SIZE):
+            values.extend(await client.mget(chunk))
+        return values
+
+    @classmethod
+    async def mset(cls, mapping: Mapping[str, Any], ttl: Optional[int] = None, chunk_size: Optional[int] = None) -> None:
+        """Set any number of keys, `chunk_size` per round trip, optionally expiring after `ttl` seconds."""
+        if ttl is None:
+            client = await cls.get_redis()
+            for chunk in _chunks(mapping.items(), chunk_size or settings.REDIS_BATCH_SIZE):
+                await client.mset(dict(chunk))
+        else:
+            # MSET cannot expire keys; pipeline SETs with EX instead
+            await cls.execute_many((("set", key, value, ttl) for key, value in mapping.items()), chunk_size)
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """Connection pool usage, for monitoring; empty until the client is created."""
+        pool = getattr(cls._client, "connection_pool", None)
+        if not isinstance(pool, InstrumentedConnectionPool):
+            return {}
+        return {
+            "max_connections": pool.max_connections,
+            "in_use": len(pool._in_use_connections),
+            "idle": len(pool._available_connections),
+            "acquired": pool.acquired,
+            "timeouts": pool.timeouts,
+            "wait_seconds_total": pool.wait_seconds,
+            "max_wait_seconds": pool.max_wait_seconds,
+            "hiredis": pool.connection_kwargs.get("parser_class") is _AsyncHiredisParser,
+        }
+
+    @classmethod
+    def render_prometheus(cls) -> List[str]:
+        """Render the pool stats in the Prometheus text exposition format."""
+        stats = cls.get_stats()
+        if not stats:
+            return []
+        return [
+            "# HELP redis_pool_connections Redis connections by state.",
+            "# TYPE redis_pool_connections gauge",
+            f'redis_pool_connections{{state="in_use"}} {stats["in_use"]}',
+            f'redis_pool_connections{{state="idle"}} {stats["idle"]}',
+            f'redis_pool_connections{{state="max"}} {stats["max_connections"]}',
+            "# HELP redis_pool_acquired_total Connections handed out by the Redis pool.",
+            "# TYPE redis_pool_acquired_total counter",
+            f"redis_pool_acquired_total {stats['acquired']}",
+            "# HELP redis_pool_wait_seconds_total Time spent getting a Redis connection from the pool.",
+            "# TYPE redis_pool_wait_seconds_total counter",
+            f"redis_pool_wait_seconds_total {stats['wait_seconds_total']}",
+            "# HELP redis_pool_timeouts_total Requests that gave up waiting for a Redis connection.",
+            "# TYPE redis_pool_timeouts_total counter",
+            f"redis_pool_timeouts_total {stats['timeouts']}",
+        ]
+
 # Dependency
 def get_redis():
     return RedisClient()
@@ -0,0 +1,99 @@
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities.user import Principal, UserInDB, UserCreate, UserUpdate, UserSummary
+from app.domain.interfaces.repositories.user_repository import IUserRepository
+from app.infrastructure.cache.user_cache import UserCache
+from app.infrastructure.database import after_commit
+from app.infrastructure.database.routing import WROTE
+
+class CachedUserRepository(IUserRepository):
+    """Wraps an IUserRepository with the shared read-through UserCache.
+
+    Lookups by id or email are served from the cache when possible; the
+    database is only queried on a miss. Cached users carry no password
+    hash, so login reads its principal from the wrapped repository. Once
+    the session `db` has written, its lookups skip the cache too: they
+    must see the session's own uncommitted rows and must not share them.
+
+    Every write invalidates the affected user in all processes once it has
+    been persisted: when the session `db` is given, that is after get_db
+    commits it, so no other request can re-cache the row in between.
+    """
+
+    def __init__(self, repository: IUserRepository, cache: UserCache, db: Optional[AsyncSession] = None):
+        self.repository = repository
+        self.cache = cache
+        self.db = db
+
+    async def _invalidate(self, invalidation: Callable[[], Awaitable[None]]) -> None:
+        if self.db is not None:
+            after_commit(self.db, invalidation)
+        else:
+            await invalidation()
+
+    async def on_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        await self.repository.on_commit(callback)
+
+    def _has_written(self) -> bool:
+        return self.db is not None and bool(self.db.info.get(WROTE))
+
+    async def get_by_id(self, user_id: int) -> Optional[UserInDB]:
+        if self._has_written():
+            return await self.repository.get_by_id(user_id)
+        return await self.cache.get(
+            self.cache.id_key(user_id),
+            lambda repository: repository.get_by_id(user_id)
+        )
+
+    async def get_by_email(self, email: str) -> Optional[UserInDB]:
+        if self._has_written():
+            return await self.repository.get_by_email(email)
+        return await self.cache.get(
+            self.cache.email_key(email),
+            lambda repository: repository.get_by_email(email)
+        )
+
+    async def get_principal_by_email(self, email: str) -> Optional[Principal]:
+        return await self.repository.get_principal_by_email(email)
+
+    async def create(self, user: UserCreate) -> UserInDB:
+        db_user = await self.repository.create(user)
+        await self._invalidate(lambda: self.cache.invalidate_user(db_user.id, [db_user.email]))
+        return db_user
+
+    async def update(self, user_id: int, user_update: UserUpdate) -> Optional[UserInDB]:
+        db_user = await self.repository.update(user_id, user_update)
+        # The cache recovers the previous email from its own entry, if any
+        await self._invalidate(lambda: self.cache.invalidate_user(user_id, [db_user.email] if db_user else []))
+        return db_user
+
+    async def delete(self, user_id: int) -> bool:
+        deleted = await self.repository.delete(user_id)
+        await self._invalidate(lambda: self.cache.invalidate_user(user_id))
+        return deleted
+
+    async def bulk_create(self, users: List[UserCreate], on_conflict: str = "ignore") -> Tuple[int, Dict[int, str]]:
+        result = await self.repository.bulk_create(users, on_conflict)
+        if on_conflict == "upsert":
+            # Existing users may have been overwritten; bulk chunks are already committed
+            await self.cache.invalidate_emails(user.email for user in users)
+        return result
+
+    async def list_users(
+        self,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> List[UserSummary]:
+        return await self.repository.list_users(
+            limit,
+            after_id=after_id,
+            is_active=is_active,
+            created_after=created_after,
+            created_before=created_before
+        )
@@ -1,14 +1,71 @@
-from typing import Dict, List, Optional
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 
-from app.domain.entities.chat import ChatMessage, ChatRoom
+from app.domain.entities.chat import ChatMessage, ChatRoom, MessageCursor
 from app.domain.interfaces.repositories.chat_repository import ChatRepository
+from app.infrastructure.config import get_settings
+
+settings = get_settings()
+
+class MessageHistory(Sequence):
+    """Bounded history of a room, oldest first, with O(1) indexing.
+
+    A ring buffer over a list: once `maxlen` messages are held, each
+    append overwrites the oldest one.
+    """
+
+    def __init__(self, maxlen: int):
+        self.maxlen = maxlen
+        self._items: List[ChatMessage] = []
+        # Slot of the oldest message once the buffer is full
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index: int) -> ChatMessage:
+        size = len(self._items)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("message index out of range")
+        return self._items[(self._head + index) % self.maxlen]
+
+    def append(self, message: ChatMessage) -> None:
+        if len(self._items) < self.maxlen:
+            self._items.append(message)
+        else:
+            self._items[self._head] = message
+            self._head = (self._head + 1) % self.maxlen
+
+    def insert(self, message: ChatMessage) -> None:
+        """Add a message in (timestamp, id) order; O(n) unless it is the newest."""
+        if not self._items or message.sort_key >= self[-1].sort_key:
+            self.append(message)
+            return
+        items = list(self)
+        keys = [item.sort_key for item in items]
+        items.insert(bisect_right(keys, message.sort_key), message)
+        # When full, the oldest message falls off (possibly this one)
+        self._items = items[-self.maxlen:]
+        self._head = 0
 
 class InMemoryChatRepository(ChatRepository):
-    """In-memory implementation of ChatRepository for development and testing."""
+    """In-memory implementation of ChatRepository for development and testing.
+    
+    Each room keeps its history in a bounded ring buffer: messages arrive in
+    timestamp order and the oldest ones fall off once `max_history` is
+    reached. Cursor bounds are located by binary search over the
+    (timestamp, id) order and the page is read by index, so any page,
+    however deep, costs O(log n + limit).
+    """
     
-    def __init__(self):
-        self.messages: Dict[str, List[ChatMessage]] = {}
+    def __init__(self, max_history: Optional[int] = None):
+        self.max_history = max_history or settings.CHAT_HISTORY_MAX_LEN
+        self.messages: Dict[str, MessageHistory] = {}
         self.rooms: Dict[str, ChatRoom] = {}
         # Create a default room
         self._create_default_room()
@@ -20,19 +77,64 @@ class InMemoryChatRepository(ChatRepository):
             name="General Chat"
         )
         self.rooms[default_room.id] = default_room
-        self.messages[default_room.id] = []
+        self.messages[default_room.id] = self._new_history()
+    
+    def _new_history(self) -> MessageHistory:
+        """Create an empty, bounded message history for a room."""
+        return MessageHistory(self.max_history)
     
     async def save_message(self, message: ChatMessage) -> None:
         """Save a message to the repository."""
         if message.room_id not in self.messages:
-            self.messages[message.room_id] = []
+            self.messages[message.room_id] = self._new_history()
         self.messages[message.room_id].append(message)
     
-    async def get_messages(self, room_id: str, limit: int = 100) -> List[ChatMessage]:
-        """Get messages for a room, most recent first."""
-        room_messages = self.messages.get(room_id, [])
-        # Return most recent messages first
-        return sorted(room_messages, key=lambda x: x.timestamp, reverse=True)[:limit]
+    async def save_messages(self, messages: List[ChatMessage]) -> None:
+        """Save several messages to the repository."""
+        for message in messages:
+            if message.room_id not in self.messages:
+                self.messages[message.room_id] = self._new_history()
+            self.messages[message.room_id].append(message)
+    
+    @staticmethod
+    def _bisect(history: MessageHistory, key: Tuple[datetime, str], inclusive: bool) -> int:
+        """Index of the first message sorting after `key` (or at it, if `inclusive`)."""
+        lo, hi = 0, len(history)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key = history[mid].sort_key
+            if mid_key < key or (not inclusive and mid_key == key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    async def get_messages(
+        self,
+        room_id: str,
+        limit: int = 100,
+        before: Optional[MessageCursor] = None,
+        after: Optional[MessageCursor] = None
+    ) -> List[ChatMessage]:
+        """Get messages for a room, most recent first.
+        
+        With only `after`, the page holds the oldest `limit` messages after
+        it, so paging forward skips nothing.
+        """
+        room_messages = self.messages.get(room_id)
+        if not room_messages:
+            return []
+        # Messages are stored in arrival order, so the newest are at the end
+        end = len(room_messages)
+        if before is not None:
+            end = self._bisect(room_messages, before.sort_key, inclusive=True)
+        start = 0
+        if after is not None:
+            start = self._bisect(room_messages, after.sort_key, inclusive=False)
+            if before is None:
+                end = min(end, start + limit)
+        count = max(min(limit, end - start), 0)
+        return [room_messages[i] for i in range(end - 1, end - count - 1, -1)]
     
     async def get_room(self, room_id: str) -> Optional[ChatRoom]:
         """Get a room by ID."""
@@ -46,23 +148,63 @@ class InMemoryChatRepository(ChatRepository):
             name=name
         )
         self.rooms[room_id] = room
-        self.messages[room_id] = []
+        self.messages[room_id] = self._new_history()
+        return room
+    
+    async def restore_room(self, room_id: str, name: str) -> ChatRoom:
+        """Recreate a room under a known id, e.g. when replaying a durable log."""
+        room = self.rooms.get(room_id)
+        if room is None:
+            room = self.rooms[room_id] = ChatRoom(id=room_id, name=name)
+        self.messages.setdefault(room_id, self._new_history())
         return room
     
-    async def add_participant(self, room_id: str, user_id: str) -> None:
+    async def restore_message(self, message: ChatMessage) -> None:
+        """Add a message in timestamp order rather than at the end, e.g. when replaying a durable log."""
+        if message.room_id not in self.messages:
+            self.messages[message.room_id] = self._new_history()
+        self.messages[message.room_id].insert(message)
+    
+    async def add_participant(self, room_id: str, user_id: str) -> int:
         """Add a participant to a room."""
         if room_id not in self.rooms:
             # Create the room if it doesn't exist
-            await self.create_room(f"Room {room_id}")
-            
-        if user_id not in self.rooms[room_id].participants:
-            self.rooms[room_id].participants.append(user_id)
+            self.rooms[room_id] = ChatRoom(id=room_id, name=f"Room {room_id}")
+            self.messages.setdefault(room_id, self._new_history())
+        
+        room = self.rooms[room_id]
+        # Participants are kept sorted for membership checks and paging
+        index = bisect_left(room.participants, user_id)
+        if index == len(room.participants) or room.participants[index] != user_id:
+            room.participants.insert(index, user_id)
+        room.presence_version += 1
+        return room.presence_version
     
-    async def remove_participant(self, room_id: str, user_id: str) -> None:
+    async def remove_participant(self, room_id: str, user_id: str) -> int:
         """Remove a participant from a room."""
-        if room_id in self.rooms:
-            if user_id in self.rooms[room_id].participants:
-                self.rooms[room_id].participants.remove(user_id)
+        room = self.rooms.get(room_id)
+        if room is None:
+            return 0
+        index = bisect_left(room.participants, user_id)
+        if index < len(room.participants) and room.participants[index] == user_id:
+            del room.participants[index]
+        room.presence_version += 1
+        return room.presence_version
+    
+    async def get_participants(
+        self,
+        room_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[str], Optional[str]]:
+        """Return participants in user id order; the cursor is the last id returned."""
+        room = self.rooms.get(room_id)
+        if room is None:
+            return [], None
+        start = bisect_right(room.participants, cursor) if cursor is not None else 0
+        page = room.participants[start:start + limit]
+        next_cursor = page[-1] if start + limit < len(room.participants) else None
+        return page, next_cursor
     
     async def list_rooms(self) -> List[ChatRoom]:
         """List all available rooms."""
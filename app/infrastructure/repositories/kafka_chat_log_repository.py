@@ -0,0 +1,284 @@
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import logging
+import time
+
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, TopicPartition
+from aiokafka.errors import KafkaError
+
+from app.domain.entities.chat import ChatMessage, ChatRoom, MessageCursor
+from app.domain.interfaces.repositories.chat_repository import ChatRepository
+from app.infrastructure.config import get_settings
+from app.infrastructure.kafka.event_publisher import KafkaEventPublisher
+from app.infrastructure.kafka.producer import decode_json, encode_json
+from app.infrastructure.redis.redis_client import RedisClient
+from app.infrastructure.repositories.chat_repository import InMemoryChatRepository
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+MESSAGE_SENT = "chat.message_sent"
+ROOM_CREATED = "chat.room_created"
+PARTICIPANT_JOINED = "chat.participant_joined"
+PARTICIPANT_LEFT = "chat.participant_left"
+
+class KafkaChatLogRepository(ChatRepository):
+    """Keeps chat in memory and appends every change to a Kafka topic, so history survives restarts.
+
+    Messages and rooms are appended to `topic`, keyed by room, through a
+    producer of the log's own (acks from all in-sync replicas, idempotent):
+    `save_message` and `create_room` return only once Kafka has
+    acknowledged the record, and raise if it could not be written.
+    Participant events are not replayed, so they go through the
+    fire-and-forget KafkaEventPublisher. The topic should be retained or
+    compacted long enough to cover a restart.
+
+    `start` rebuilds recent history. It loads the snapshot stored in Redis
+    at the last shutdown, then replays the log from the offsets recorded
+    in it. Those are the offsets the process that stored it had consumed:
+    where its own replay ended, moved on by its own acknowledged records
+    for as long as no other process wrote in between. Any worker's
+    snapshot is therefore a consistent starting point, even though all
+    workers share one key. Without a snapshot the last
+    `replay_max_records` records of each partition are replayed. Replayed
+    messages are deduplicated by id and put in (timestamp, id) order, as
+    other workers' clocks may lag. Replay is bounded by that window and by
+    `replay_timeout_seconds`, and every room keeps at most
+    CHAT_HISTORY_MAX_LEN messages, so memory and startup time stay
+    bounded. Progress is logged and kept in `replay_progress`.
+    Participants are not restored: nobody is connected after a restart.
+    """
+
+    def __init__(
+        self,
+        repository: InMemoryChatRepository,
+        topic: Optional[str] = None,
+        replay_max_records: Optional[int] = None,
+        replay_timeout_seconds: Optional[int] = None,
+        snapshot_per_room: Optional[int] = None
+    ):
+        self.repository = repository
+        self.topic = topic or settings.CHAT_LOG_TOPIC
+        self.replay_max_records = replay_max_records or settings.CHAT_LOG_REPLAY_MAX_RECORDS
+        self.replay_timeout = replay_timeout_seconds or settings.CHAT_LOG_REPLAY_TIMEOUT_SECONDS
+        self.snapshot_per_room = snapshot_per_room or settings.CHAT_LOG_SNAPSHOT_PER_ROOM
+        self.events = KafkaEventPublisher(topic=self.topic)
+        self._producer: Optional[AIOKafkaProducer] = None
+        self.replay_progress: Dict[str, Any] = {"replayed": 0, "total": 0, "done": False}
+        # Log offsets (per partition) up to which memory holds every record; None until known
+        self._consumed: Optional[Dict[int, int]] = None
+
+    @property
+    def snapshot_key(self) -> str:
+        return f"chat_log:snapshot:{self.topic}"
+
+    async def start(self) -> None:
+        await self.events.start()
+        await self.replay()
+
+    async def close(self) -> None:
+        await self.events.stop()
+        if self._producer is not None:
+            await self._producer.stop()
+            self._producer = None
+        await self.save_snapshot()
+        await self.repository.close()
+
+    async def _get_producer(self) -> AIOKafkaProducer:
+        if self._producer is None:
+            producer = AIOKafkaProducer(
+                bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+                value_serializer=encode_json,
+                acks="all",
+                enable_idempotence=True,
+                max_batch_size=settings.KAFKA_PRODUCER_BATCH_SIZE,
+                linger_ms=settings.KAFKA_PRODUCER_LINGER_MS,
+                compression_type=settings.KAFKA_PRODUCER_COMPRESSION or None
+            )
+            try:
+                await producer.start()
+            except Exception:
+                await producer.stop()
+                raise
+            self._producer = producer
+        return self._producer
+
+    async def _append(self, events: List[Tuple[str, Dict[str, Any], str]]) -> None:
+        """Write (type, data, key) events to the log and wait until Kafka has acknowledged them."""
+        producer = await self._get_producer()
+        deliveries = []
+        for event_type, data, key in events:
+            envelope = {"type": event_type, "occurred_at": datetime.now(timezone.utc), "data": data}
+            deliveries.append(await producer.send(self.topic, envelope, key=key.encode()))
+        for delivery in deliveries:
+            metadata = await delivery
+            if self._consumed is not None and self._consumed.get(metadata.partition, 0) == metadata.offset:
+                # Nothing else was written in between, so memory still holds the whole log up to here
+                self._consumed[metadata.partition] = metadata.offset + 1
+
+    async def replay(self, progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """Rebuild recent history from the snapshot and the log; returns the records replayed."""
+        started = time.monotonic()
+        stored = await self._restore_snapshot()
+        # Ids already in memory; the log repeats those the snapshot holds
+        seen = {message.id for history in self.repository.messages.values() for message in history}
+        replayed = 0
+        consumer = AIOKafkaConsumer(
+            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+            enable_auto_commit=False
+        )
+        try:
+            await consumer.start()
+            partitions = consumer.partitions_for_topic(self.topic)
+            if not partitions:
+                logger.info(f"Chat log {self.topic} does not exist yet; starting without history")
+                self._consumed = {}
+                return 0
+            tps = [TopicPartition(self.topic, partition) for partition in sorted(partitions)]
+            consumer.assign(tps)
+            beginning = await consumer.beginning_offsets(tps)
+            end = await consumer.end_offsets(tps)
+            remaining = set()
+            total = 0
+            for tp in tps:
+                start = max(beginning[tp], stored.get(tp.partition, 0), end[tp] - self.replay_max_records)
+                if start < end[tp]:
+                    consumer.seek(tp, start)
+                    remaining.add(tp)
+                    total += end[tp] - start
+            self.replay_progress.update(total=total)
+
+            deadline = started + self.replay_timeout
+            last_report = time.monotonic()
+            reached = dict(end)
+            while remaining:
+                if time.monotonic() > deadline:
+                    logger.warning(f"Chat log replay timed out after {replayed}/{total} records; history is partial")
+                    # Only what was applied is covered; the next snapshot resumes from there
+                    for tp in remaining:
+                        reached[tp] = await consumer.position(tp)
+                    break
+                batches = await consumer.getmany(*remaining, timeout_ms=500, max_records=5000)
+                for tp, records in batches.items():
+                    for record in records:
+                        if record.offset < end[tp]:
+                            await self._apply(decode_json(record.value), seen)
+                            replayed += 1
+                for tp in list(remaining):
+                    # Compaction leaves gaps, so compare positions rather than offsets seen
+                    if await consumer.position(tp) >= end[tp]:
+                        remaining.discard(tp)
+                self.replay_progress.update(replayed=replayed)
+                if progress is not None:
+                    progress(replayed, total)
+                if time.monotonic() - last_report >= 1:
+                    last_report = time.monotonic()
+                    logger.info(f"Chat log replay: {replayed}/{total} records ({replayed * 100 // max(total, 1)}%)")
+            self._consumed = {tp.partition: offset for tp, offset in reached.items()}
+        except KafkaError as e:
+            # Nothing is known to be covered; keep the stored snapshot for the next start
+            logger.error(f"Chat log replay failed after {replayed} records: {e}")
+        finally:
+            await consumer.stop()
+            self.replay_progress.update(done=True)
+        logger.info(f"Chat log replayed {replayed} records in {time.monotonic() - started:.1f}s")
+        return replayed
+
+    async def _apply(self, event: Dict[str, Any], seen: Set[str]) -> None:
+        data = event["data"]
+        if event["type"] == MESSAGE_SENT:
+            message = ChatMessage.model_validate(data)
+            if message.id not in seen:
+                seen.add(message.id)
+                await self.repository.restore_message(message)
+        elif event["type"] == ROOM_CREATED:
+            await self.repository.restore_room(data["id"], data["name"])
+
+    async def _restore_snapshot(self) -> Dict[int, int]:
+        """Load the last snapshot into memory; returns the log offsets it covers."""
+        try:
+            redis_client = await RedisClient.get_redis()
+            raw = await redis_client.get(self.snapshot_key)
+        except Exception as e:
+            logger.warning(f"Could not load the chat snapshot: {e}")
+            return {}
+        if raw is None:
+            return {}
+        snapshot = decode_json(raw)
+        for room in snapshot["rooms"]:
+            await self.repository.restore_room(room["id"], room["name"])
+        messages = [ChatMessage.model_validate(message) for message in snapshot["messages"]]
+        await self.repository.save_messages(messages)
+        logger.info(f"Restored {len(messages)} chat messages from the snapshot")
+        return {int(partition): offset for partition, offset in snapshot["offsets"].items()}
+
+    async def save_snapshot(self) -> None:
+        """Store the newest messages of every room, and the log offsets memory covers, in Redis."""
+        if self._consumed is None:
+            # History since startup is incomplete; the next start replays the log instead
+            return
+        rooms = await self.repository.list_rooms()
+        messages = []
+        for room_id in list(self.repository.messages):
+            page = await self.repository.get_messages(room_id, self.snapshot_per_room)
+            messages.extend(message.model_dump() for message in reversed(page))
+        snapshot = {
+            "offsets": {str(partition): offset for partition, offset in self._consumed.items()},
+            "rooms": [{"id": room.id, "name": room.name} for room in rooms],
+            "messages": messages,
+        }
+        try:
+            redis_client = await RedisClient.get_redis()
+            await redis_client.set(self.snapshot_key, encode_json(snapshot))
+        except Exception as e:
+            logger.warning(f"Could not store the chat snapshot: {e}")
+
+    async def save_message(self, message: ChatMessage) -> None:
+        await self._append([(MESSAGE_SENT, message.model_dump(), message.room_id)])
+        await self.repository.save_message(message)
+
+    async def save_messages(self, messages: List[ChatMessage]) -> None:
+        await self._append([(MESSAGE_SENT, message.model_dump(), message.room_id) for message in messages])
+        await self.repository.save_messages(messages)
+
+    async def get_messages(
+        self,
+        room_id: str,
+        limit: int = 100,
+        before: Optional[MessageCursor] = None,
+        after: Optional[MessageCursor] = None
+    ) -> List[ChatMessage]:
+        return await self.repository.get_messages(room_id, limit, before=before, after=after)
+
+    async def get_room(self, room_id: str) -> Optional[ChatRoom]:
+        return await self.repository.get_room(room_id)
+
+    async def create_room(self, room_name: str) -> ChatRoom:
+        room = await self.repository.create_room(room_name)
+        await self._append([(ROOM_CREATED, {"id": room.id, "name": room.name}, room.id)])
+        return room
+
+    async def add_participant(self, room_id: str, user_id: str) -> int:
+        is_new_room = await self.repository.get_room(room_id) is None
+        version = await self.repository.add_participant(room_id, user_id)
+        if is_new_room:
+            room = await self.repository.get_room(room_id)
+            await self._append([(ROOM_CREATED, {"id": room.id, "name": room.name}, room_id)])
+        self.events.publish(PARTICIPANT_JOINED, {"room_id": room_id, "user_id": user_id}, key=room_id)
+        return version
+
+    async def remove_participant(self, room_id: str, user_id: str) -> int:
+        version = await self.repository.remove_participant(room_id, user_id)
+        self.events.publish(PARTICIPANT_LEFT, {"room_id": room_id, "user_id": user_id}, key=room_id)
+        return version
+
+    async def get_participants(
+        self,
+        room_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[str], Optional[str]]:
+        return await self.repository.get_participants(room_id, limit, cursor)
+
+    async def list_rooms(self) -> List[ChatRoom]:
+        return await self.repository.list_rooms()
@@ -0,0 +1,207 @@
+from datetime import timezone
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+from app.domain.entities.chat import ChatMessage, ChatRoom, MessageCursor
+from app.domain.interfaces.repositories.chat_repository import ChatRepository
+from app.infrastructure.config import get_settings
+from app.infrastructure.redis.redis_client import RedisClient
+
+settings = get_settings()
+
+# Key layout
+ROOMS_KEY = "chat:rooms"                        # hash: room_id -> room JSON (without participants)
+MESSAGES_KEY = "chat:messages:{room_id}"        # stream: capped per-room history
+PARTICIPANTS_KEY = "chat:participants:{room_id}"  # set: user ids
+PRESENCE_VERSIONS_KEY = "chat:presence_versions"  # hash: room_id -> presence version
+
+# Stream ids come from the Redis clock while cursors use message timestamps,
+# so cursor ranges are widened by this much and then filtered exactly.
+CLOCK_SKEW_MS = 5000
+
+class RedisChatRepository(ChatRepository):
+    """Redis implementation of ChatRepository shared by all worker processes.
+
+    Messages live in one capped stream per room (XADD ... MAXLEN ~ N), so
+    history is bounded and `get_messages` is a single XREVRANGE with COUNT.
+    Rooms are stored in a hash and participants in one set per room; each
+    join or leave bumps the room's presence version in the same pipeline.
+
+    Cursor bounds are translated into stream id ranges, so a page starts
+    near the cursor instead of scanning from the newest entry.
+    """
+
+    def __init__(self, max_history: Optional[int] = None):
+        self.max_history = max_history or settings.CHAT_HISTORY_MAX_LEN
+        self._default_room_ready = False
+
+    @staticmethod
+    def _room_to_json(room: ChatRoom) -> str:
+        return room.model_dump_json(exclude={"participants", "presence_version"})
+
+    async def _ensure_default_room(self, redis_client) -> None:
+        """Create the default general chat room once per process."""
+        if self._default_room_ready:
+            return
+        default_room = ChatRoom(id="general", name="General Chat")
+        await redis_client.hsetnx(ROOMS_KEY, default_room.id, self._room_to_json(default_room))
+        self._default_room_ready = True
+
+    async def save_message(self, message: ChatMessage) -> None:
+        """Append a message to the room's capped stream."""
+        redis_client = await RedisClient.get_redis()
+        await redis_client.xadd(
+            MESSAGES_KEY.format(room_id=message.room_id),
+            {"m": message.to_json()},
+            maxlen=self.max_history,
+            approximate=True
+        )
+
+    async def save_messages(self, messages: List[ChatMessage]) -> None:
+        """Append several messages to their rooms' streams in one round trip."""
+        if not messages:
+            return
+        redis_client = await RedisClient.get_redis()
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for message in messages:
+                pipe.xadd(
+                    MESSAGES_KEY.format(room_id=message.room_id),
+                    {"m": message.to_json()},
+                    maxlen=self.max_history,
+                    approximate=True
+                )
+            await pipe.execute()
+
+    @staticmethod
+    def _stream_bound(cursor: MessageCursor, offset_ms: int) -> str:
+        """Stream id (in ms) near a cursor's timestamp, shifted by `offset_ms`."""
+        timestamp = cursor.timestamp
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return str(max(int(timestamp.timestamp() * 1000) + offset_ms, 0))
+
+    @staticmethod
+    def _load_message(payload: str) -> ChatMessage:
+        message = ChatMessage.model_validate_json(payload)
+        # The stored payload is already the message's JSON encoding
+        message._json = payload
+        return message
+
+    async def get_messages(
+        self,
+        room_id: str,
+        limit: int = 100,
+        before: Optional[MessageCursor] = None,
+        after: Optional[MessageCursor] = None
+    ) -> List[ChatMessage]:
+        """Get messages for a room, most recent first.
+
+        With only `after`, the page holds the oldest `limit` messages after
+        it (read forward with XRANGE), so paging forward skips nothing.
+        """
+        redis_client = await RedisClient.get_redis()
+        key = MESSAGES_KEY.format(room_id=room_id)
+        max_id = "+" if before is None else self._stream_bound(before, CLOCK_SKEW_MS)
+        min_id = "-" if after is None else self._stream_bound(after, -CLOCK_SKEW_MS)
+        forward = after is not None and before is None
+
+        messages: List[ChatMessage] = []
+        while len(messages) < limit:
+            if forward:
+                entries = await redis_client.xrange(key, min=min_id, max=max_id, count=limit)
+            else:
+                entries = await redis_client.xrevrange(key, max=max_id, min=min_id, count=limit)
+            for _, fields in entries:
+                message = self._load_message(fields["m"])
+                if before is not None and message.sort_key >= before.sort_key:
+                    continue
+                if after is not None and message.sort_key <= after.sort_key:
+                    continue
+                messages.append(message)
+                if len(messages) == limit:
+                    break
+            if len(entries) < limit:
+                break
+            # Continue just past the last entry seen
+            if forward:
+                min_id = "(" + entries[-1][0]
+            else:
+                max_id = "(" + entries[-1][0]
+        if forward:
+            messages.reverse()
+        return messages
+
+    async def get_room(self, room_id: str) -> Optional[ChatRoom]:
+        """Get a room by ID."""
+        redis_client = await RedisClient.get_redis()
+        await self._ensure_default_room(redis_client)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hget(ROOMS_KEY, room_id)
+            pipe.smembers(PARTICIPANTS_KEY.format(room_id=room_id))
+            pipe.hget(PRESENCE_VERSIONS_KEY, room_id)
+            room_json, participants, version = await pipe.execute()
+        if room_json is None:
+            return None
+        room = ChatRoom.model_validate_json(room_json)
+        room.participants = sorted(participants)
+        room.presence_version = int(version or 0)
+        return room
+
+    async def create_room(self, name: str) -> ChatRoom:
+        """Create a new chat room."""
+        redis_client = await RedisClient.get_redis()
+        room = ChatRoom(id=str(uuid4()), name=name)
+        await redis_client.hset(ROOMS_KEY, room.id, self._room_to_json(room))
+        return room
+
+    async def add_participant(self, room_id: str, user_id: str) -> int:
+        """Add a participant to a room, creating the room if it doesn't exist."""
+        redis_client = await RedisClient.get_redis()
+        room = ChatRoom(id=room_id, name=f"Room {room_id}")
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hsetnx(ROOMS_KEY, room_id, self._room_to_json(room))
+            pipe.sadd(PARTICIPANTS_KEY.format(room_id=room_id), user_id)
+            pipe.hincrby(PRESENCE_VERSIONS_KEY, room_id, 1)
+            _, _, version = await pipe.execute()
+        return version
+
+    async def remove_participant(self, room_id: str, user_id: str) -> int:
+        """Remove a participant from a room."""
+        redis_client = await RedisClient.get_redis()
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.srem(PARTICIPANTS_KEY.format(room_id=room_id), user_id)
+            pipe.hincrby(PRESENCE_VERSIONS_KEY, room_id, 1)
+            _, version = await pipe.execute()
+        return version
+
+    async def get_participants(
+        self,
+        room_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[str], Optional[str]]:
+        """Page through a room's participants with SSCAN; the cursor is SSCAN's."""
+        redis_client = await RedisClient.get_redis()
+        next_cursor, members = await redis_client.sscan(
+            PARTICIPANTS_KEY.format(room_id=room_id), cursor=int(cursor or 0), count=limit
+        )
+        return members, (str(next_cursor) if next_cursor else None)
+
+    async def list_rooms(self) -> List[ChatRoom]:
+        """List all available rooms."""
+        redis_client = await RedisClient.get_redis()
+        await self._ensure_default_room(redis_client)
+        rooms_json = await redis_client.hgetall(ROOMS_KEY)
+        room_ids = list(rooms_json)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for room_id in room_ids:
+                pipe.smembers(PARTICIPANTS_KEY.format(room_id=room_id))
+            pipe.hgetall(PRESENCE_VERSIONS_KEY)
+            *participants, versions = await pipe.execute()
+        rooms = []
+        for room_id, members in zip(room_ids, participants):
+            room = ChatRoom.model_validate_json(rooms_json[room_id])
+            room.participants = sorted(members)
+            room.presence_version = int(versions.get(room_id, 0))
+            rooms.append(room)
+        return rooms
@@ -1,55 +1,291 @@
-from typing import Optional
-from sqlalchemy import select, update, delete
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import re
+from sqlalchemy import case, or_, select, update, delete, insert, func, lambda_stmt
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.domain.entities.user import UserInDB, UserCreate, UserUpdate
+from app.domain.entities.user import Principal, UserInDB, UserCreate, UserUpdate, UserSummary
 from app.domain.interfaces.repositories.user_repository import IUserRepository
+from app.domain.interfaces.security.password_hasher import IPasswordHasher
+from app.infrastructure.database import after_commit
 from app.infrastructure.database.models.user import User
-from passlib.context import CryptContext
+from app.infrastructure.database.routing import USE_PRIMARY, read_your_writes
+from app.infrastructure.security.password_hasher import password_hasher as default_password_hasher
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Columns of a UserSummary; listing selects only these instead of full User rows
+SUMMARY_COLUMNS = (
+    User.id,
+    User.email,
+    User.username,
+    User.full_name,
+    User.is_active,
+    User.created_at,
+    User.updated_at,
+)
+# Columns of a Principal, all the login path reads
+PRINCIPAL_COLUMNS = (User.id, User.email, User.hashed_password, User.is_active)
+
+# The unique username index as each dialect names it in the error, never a value:
+# PostgreSQL 'constraint "ix_users_username"', MySQL "for key '[users.]ix_users_username'",
+# SQLite "UNIQUE constraint failed: users.username"
+USERNAME_CONFLICT = re.compile(r"""["'.]ix_users_username["']|constraint failed: users\.username\b""")
+
+def _conflicting_field(error: IntegrityError) -> str:
+    """Name the unique column behind an IntegrityError from any supported dialect."""
+    return "username" if USERNAME_CONFLICT.search(str(error.orig)) else "email"
 
 class UserRepository(IUserRepository):
-    def __init__(self, db: AsyncSession):
+    """SQLAlchemy-backed user repository.
+    
+    Writes are not committed here: the owner of the session (get_db for
+    requests) commits once per unit of work. A failed write leaves the
+    transaction to be rolled back by that owner. The exception is
+    `bulk_create`, which commits every chunk so long imports neither hold
+    one huge transaction nor lose finished chunks.
+    """
+    
+    def __init__(self, db: AsyncSession, password_hasher: Optional[IPasswordHasher] = None):
         self.db = db
+        self.password_hasher = password_hasher or default_password_hasher
+    
+    # Point lookups are cached lambda statements over the table, not the
+    # mapped class: SQLAlchemy compiles them once and reuses the SQL, and
+    # rows come back as plain mappings without entering the identity map.
     
     async def get_by_id(self, user_id: int) -> Optional[UserInDB]:
-        result = await self.db.execute(select(User).filter(User.id == user_id))
-        user = result.scalars().first()
-        return UserInDB.model_validate(user) if user else None
+        stmt = lambda_stmt(lambda: select(User.__table__).where(User.id == user_id))
+        result = await self.db.execute(stmt, bind_arguments=read_your_writes.bind_arguments(f"id:{user_id}"))
+        row = result.mappings().first()
+        return UserInDB.model_validate(dict(row)) if row else None
     
     async def get_by_email(self, email: str) -> Optional[UserInDB]:
-        result = await self.db.execute(select(User).filter(User.email == email))
-        user = result.scalars().first()
-        return UserInDB.model_validate(user) if user else None
+        stmt = lambda_stmt(lambda: select(User.__table__).where(User.email == email))
+        result = await self.db.execute(stmt, bind_arguments=read_your_writes.bind_arguments(f"email:{email.lower()}"))
+        row = result.mappings().first()
+        return UserInDB.model_validate(dict(row)) if row else None
+    
+    async def get_principal_by_email(self, email: str) -> Optional[Principal]:
+        stmt = lambda_stmt(lambda: select(*PRINCIPAL_COLUMNS).where(User.email == email))
+        result = await self.db.execute(stmt, bind_arguments=read_your_writes.bind_arguments(f"email:{email.lower()}"))
+        row = result.mappings().first()
+        # Trusted columns straight from the database; skip re-validating them
+        return Principal.model_construct(**row) if row else None
     
     async def create(self, user: UserCreate) -> UserInDB:
-        hashed_password = pwd_context.hash(user.password)
-        db_user = User(
-            email=user.email,
-            username=user.username,
-            full_name=user.full_name,
-            hashed_password=hashed_password,
-            is_active=user.is_active
-        )
-        self.db.add(db_user)
-        await self.db.commit()
-        await self.db.refresh(db_user)
-        return UserInDB.model_validate(db_user)
+        """Insert a user in one statement; the unique indexes reject duplicates."""
+        values = {
+            "email": user.email,
+            "username": user.username,
+            "full_name": user.full_name,
+            "hashed_password": await self.password_hasher.hash(user.password),
+            "is_active": user.is_active,
+        }
+        dialect = self.db.get_bind().dialect
+        try:
+            if dialect.insert_returning:
+                result = await self.db.execute(insert(User).values(**values).returning(*User.__table__.c))
+                row = dict(result.mappings().one())
+            else:
+                # MySQL has no RETURNING; stamp created_at here so nothing has to be read back
+                values["created_at"] = datetime.utcnow().replace(microsecond=0)
+                result = await self.db.execute(insert(User).values(**values))
+                row = {**values, "id": result.inserted_primary_key[0], "updated_at": None}
+        except IntegrityError as e:
+            raise ValueError(f"User with this {_conflicting_field(e)} already exists")
+        read_your_writes.mark(f"id:{row['id']}", f"email:{row['email'].lower()}")
+        return UserInDB.model_validate(row)
     
     async def update(self, user_id: int, user_update: UserUpdate) -> Optional[UserInDB]:
+        """Update a user in one statement (plus a read-back where RETURNING is missing)."""
         update_data = user_update.model_dump(exclude_unset=True)
         if "password" in update_data:
-            update_data["hashed_password"] = pwd_context.hash(update_data.pop("password"))
-        
-        stmt = update(User).where(User.id == user_id).values(**update_data).returning(User)
-        result = await self.db.execute(stmt)
-        await self.db.commit()
+            update_data["hashed_password"] = await self.password_hasher.hash(update_data.pop("password"))
+        if not update_data:
+            return await self.get_by_id(user_id)
         
-        updated_user = result.scalars().first()
-        return UserInDB.model_validate(updated_user) if updated_user else None
+        stmt = update(User).where(User.id == user_id).values(**update_data)
+        columns = list(User.__table__.c)
+        dialect = self.db.get_bind().dialect
+        if "email" in update_data and dialect.name == "postgresql":
+            # Lookups by the old email must stop seeing this user too. PostgreSQL
+            # can return it from the same statement: UPDATE ... FROM reads the
+            # row as it was before the update. Elsewhere the user cache's
+            # invalidation covers the old email.
+            previous = select(User.id, User.email.label("previous_email")).where(User.id == user_id).subquery()
+            stmt = stmt.where(User.id == previous.c.id)
+            columns.append(previous.c.previous_email)
+        try:
+            if dialect.update_returning:
+                result = await self.db.execute(stmt.returning(*columns))
+                row = result.mappings().first()
+            else:
+                result = await self.db.execute(stmt)
+                row = None
+                if result.rowcount:
+                    result = await self.db.execute(select(User.__table__).where(User.id == user_id))
+                    row = result.mappings().first()
+        except IntegrityError as e:
+            field = _conflicting_field(e)
+            raise ValueError("Email already in use" if field == "email" else "Username already in use")
+        if row is None:
+            return None
+        row = dict(row)
+        previous_email = row.pop("previous_email", None)
+        keys = [f"id:{user_id}", f"email:{row['email'].lower()}"]
+        if previous_email is not None:
+            keys.append(f"email:{previous_email.lower()}")
+        read_your_writes.mark(*keys)
+        return UserInDB.model_validate(row)
     
     async def delete(self, user_id: int) -> bool:
+        """Delete a user; lookups by its id and email then read from the primary for a while."""
         stmt = delete(User).where(User.id == user_id)
-        result = await self.db.execute(stmt)
+        if self.db.get_bind().dialect.delete_returning:
+            result = await self.db.execute(stmt.returning(User.email))
+            email = result.scalar_one_or_none()
+            deleted = email is not None
+        else:
+            # No RETURNING (MySQL): the user cache's invalidation covers the email
+            result = await self.db.execute(stmt)
+            email = None
+            deleted = result.rowcount > 0
+        keys = [f"id:{user_id}"]
+        if email is not None:
+            keys.append(f"email:{email.lower()}")
+        read_your_writes.mark(*keys)
+        return deleted
+    
+    async def on_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        after_commit(self.db, callback)
+    
+    async def bulk_create(self, users: List[UserCreate], on_conflict: str = "ignore") -> Tuple[int, Dict[int, str]]:
+        failures: Dict[int, str] = {}
+        if on_conflict == "upsert":
+            failures = await self._username_conflicts(users)
+        indexes = [index for index in range(len(users)) if index not in failures]
+        if not indexes:
+            return 0, failures
+        hashed_passwords = await self.password_hasher.hash_many([users[index].password for index in indexes])
+        rows = [
+            {
+                "email": users[index].email,
+                "username": users[index].username,
+                "full_name": users[index].full_name,
+                "hashed_password": hashed_password,
+                "is_active": users[index].is_active,
+            }
+            for index, hashed_password in zip(indexes, hashed_passwords)
+        ]
+        
+        if on_conflict == "upsert":
+            read_your_writes.mark(*(f"email:{row['email'].lower()}" for row in rows))
+        try:
+            written = await self._insert_rows(rows, on_conflict)
+            await self.db.commit()
+            return written, failures
+        except DBAPIError:
+            await self.db.rollback()
+        
+        # Some row broke the multi-row INSERT; retry one by one to isolate it
+        written = 0
+        for index, row in zip(indexes, rows):
+            try:
+                async with self.db.begin_nested():
+                    written += await self._insert_rows([row], on_conflict)
+            except DBAPIError as e:
+                failures[index] = str(e.orig)
         await self.db.commit()
-        return result.rowcount > 0
+        return written, failures
+    
+    async def _username_conflicts(self, users: List[UserCreate]) -> Dict[int, str]:
+        """Rows whose username belongs to another email, which an upsert must not overwrite."""
+        result = await self.db.execute(
+            select(User.username, User.email).where(User.username.in_({user.username for user in users})),
+            bind_arguments={USE_PRIMARY: True}
+        )
+        owners = {username: email.lower() for username, email in result}
+        conflicts: Dict[int, str] = {}
+        for index, user in enumerate(users):
+            # Earlier rows of the chunk claim their usernames too
+            if owners.setdefault(user.username, user.email.lower()) != user.email.lower():
+                conflicts[index] = "Username already in use"
+        return conflicts
+    
+    async def _insert_rows(self, rows: List[Dict[str, Any]], on_conflict: str) -> int:
+        """Write rows with one multi-row INSERT, resolving conflicts in the database."""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "mysql":
+            stmt = mysql.insert(User).values(rows)
+            if on_conflict == "upsert":
+                # The update fires on any unique key. Rows that collided on a
+                # username owned by another email (racing _username_conflicts)
+                # leave that user untouched.
+                same_user = User.email == stmt.inserted.email
+                stmt = stmt.on_duplicate_key_update(
+                    username=case((same_user, stmt.inserted.username), else_=User.username),
+                    full_name=case((same_user, stmt.inserted.full_name), else_=User.full_name),
+                    hashed_password=case((same_user, stmt.inserted.hashed_password), else_=User.hashed_password),
+                    is_active=case((same_user, stmt.inserted.is_active), else_=User.is_active),
+                    updated_at=case((same_user, func.now()), else_=User.updated_at),
+                )
+            else:
+                stmt = stmt.prefix_with("IGNORE")
+        elif dialect in ("postgresql", "sqlite"):
+            stmt = (postgresql if dialect == "postgresql" else sqlite).insert(User).values(rows)
+            if on_conflict == "upsert":
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[User.email],
+                    set_={
+                        "username": stmt.excluded.username,
+                        "full_name": stmt.excluded.full_name,
+                        "hashed_password": stmt.excluded.hashed_password,
+                        "is_active": stmt.excluded.is_active,
+                        "updated_at": func.now(),
+                    },
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing()
+        else:
+            stmt = insert(User).values(rows)
+        
+        result = await self.db.execute(stmt)
+        if on_conflict == "upsert":
+            # MySQL counts an updated row twice; every row was either inserted or updated
+            return len(rows)
+        return result.rowcount
+    
+    async def list_users(
+        self,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> List[UserSummary]:
+        stmt = select(*SUMMARY_COLUMNS).limit(limit)
+        if created_after is None and created_before is None:
+            stmt = stmt.order_by(User.id)
+            if after_id is not None:
+                stmt = stmt.where(User.id > after_id)
+        else:
+            # Seek on ix_users_created_at_id, which ORDER BY id could not use with a date range
+            stmt = stmt.order_by(User.created_at, User.id)
+            if after_id is not None:
+                result = await self.db.execute(select(User.created_at).where(User.id == after_id))
+                after_created_at = result.scalar_one_or_none()
+                if after_created_at is None:
+                    raise ValueError("Invalid cursor")
+                stmt = stmt.where(
+                    User.created_at >= after_created_at,
+                    or_(User.created_at > after_created_at, User.id > after_id)
+                )
+        if is_active is not None:
+            stmt = stmt.where(User.is_active == is_active)
+        if created_after is not None:
+            stmt = stmt.where(User.created_at >= created_after)
+        if created_before is not None:
+            stmt = stmt.where(User.created_at < created_before)
+        result = await self.db.execute(stmt)
+        # Rows come straight from the database, so skip re-validating them
+        return [UserSummary.model_construct(**row) for row in result.mappings()]
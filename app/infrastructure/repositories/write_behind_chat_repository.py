@@ -0,0 +1,167 @@
+from typing import List, Optional, Tuple
+import asyncio
+import logging
+
+from app.domain.entities.chat import ChatMessage, ChatRoom, MessageCursor
+from app.domain.interfaces.repositories.chat_repository import ChatRepository
+from app.infrastructure.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class WriteBehindChatRepository(ChatRepository):
+    """Wraps a ChatRepository and persists messages in the background.
+
+    `save_message` returns as soon as the message is buffered, so storage
+    latency stays off the send path. A flusher task writes buffered
+    messages through the wrapped repository's `save_messages`, either once
+    `batch_size` messages are waiting or `flush_interval_ms` after the
+    first one arrived. When `max_pending` messages are buffered,
+    `save_message` waits for room (backpressure). `close` drains the
+    buffer.
+
+    A batch that fails to persist is retried up to `max_retries` times,
+    waiting `retry_backoff_ms` and then twice as long each time. Only then
+    is it given up on and counted as failed. Later batches wait behind it,
+    so messages are still written in order.
+
+    Reads go straight to the wrapped repository, so they can lag behind
+    sends by up to one flush interval.
+    """
+
+    def __init__(
+        self,
+        repository: ChatRepository,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff_ms: Optional[int] = None,
+    ):
+        self.repository = repository
+        self.batch_size = batch_size or settings.CHAT_WRITE_BEHIND_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.CHAT_WRITE_BEHIND_FLUSH_MS) / 1000
+        self.max_pending = max_pending or settings.CHAT_WRITE_BEHIND_MAX_PENDING
+        self.max_retries = max_retries if max_retries is not None else settings.CHAT_WRITE_BEHIND_MAX_RETRIES
+        self.retry_backoff = (retry_backoff_ms or settings.CHAT_WRITE_BEHIND_RETRY_BACKOFF_MS) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher_task: Optional[asyncio.Task] = None
+        # Counters
+        self.flushed = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+
+    def _ensure_started(self) -> asyncio.Queue:
+        """Create the buffer and flusher task on first use (needs a running loop)."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+        if self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = asyncio.create_task(self._flush_loop())
+        return self._queue
+
+    @property
+    def pending(self) -> int:
+        """Number of messages buffered but not yet persisted."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def save_message(self, message: ChatMessage) -> None:
+        """Buffer a message for persistence; waits only when the buffer is full."""
+        await self._ensure_started().put(message)
+
+    async def save_messages(self, messages: List[ChatMessage]) -> None:
+        """Buffer several messages for persistence."""
+        queue = self._ensure_started()
+        for message in messages:
+            await queue.put(message)
+
+    async def _flush_loop(self) -> None:
+        """Collect buffered messages into batches and write them out."""
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await self._queue.get()
+            if message is None:
+                return
+            batch = [message]
+            deadline = loop.time() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    message = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        message = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if message is None:
+                    stop = True
+                    break
+                batch.append(message)
+            await self._write(batch)
+            if stop:
+                return
+
+    async def _write(self, batch: List[ChatMessage]) -> None:
+        backoff = self.retry_backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.repository.save_messages(batch)
+                self.flushed += len(batch)
+                self.batches += 1
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.failed += len(batch)
+                    logger.error(f"Failed to persist {len(batch)} chat messages after {attempt + 1} attempts: {e}")
+                    return
+                self.retries += 1
+                logger.warning(f"Failed to persist {len(batch)} chat messages, retrying in {backoff:.2f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff *= 2
+
+    async def start(self) -> None:
+        await self.repository.start()
+
+    async def close(self) -> None:
+        """Persist everything still buffered and stop the flusher task."""
+        if self._flusher_task is not None and not self._flusher_task.done():
+            # The sentinel is queued behind every buffered message
+            await self._queue.put(None)
+            await self._flusher_task
+        self._flusher_task = None
+        await self.repository.close()
+
+    async def get_messages(
+        self,
+        room_id: str,
+        limit: int = 100,
+        before: Optional[MessageCursor] = None,
+        after: Optional[MessageCursor] = None
+    ) -> List[ChatMessage]:
+        return await self.repository.get_messages(room_id, limit, before=before, after=after)
+
+    async def get_room(self, room_id: str) -> Optional[ChatRoom]:
+        return await self.repository.get_room(room_id)
+
+    async def create_room(self, room_name: str) -> ChatRoom:
+        return await self.repository.create_room(room_name)
+
+    async def add_participant(self, room_id: str, user_id: str) -> int:
+        return await self.repository.add_participant(room_id, user_id)
+
+    async def remove_participant(self, room_id: str, user_id: str) -> int:
+        return await self.repository.remove_participant(room_id, user_id)
+
+    async def get_participants(
+        self,
+        room_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[str], Optional[str]]:
+        return await self.repository.get_participants(room_id, limit, cursor)
+
+    async def list_rooms(self) -> List[ChatRoom]:
+        return await self.repository.list_rooms()
@@ -0,0 +1,131 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Callable, List, Optional
+import asyncio
+import logging
+
+from passlib.context import CryptContext
+
+from app.domain.interfaces.security.password_hasher import IPasswordHasher
+from app.infrastructure.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+class PasswordHasherBusyError(Exception):
+    """Raised when a password operation waited too long for a free slot."""
+    pass
+
+# Module-level so they can be pickled into the worker processes
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+def _noop() -> None:
+    return None
+
+class ProcessPoolPasswordHasher(IPasswordHasher):
+    """Runs bcrypt in a dedicated process pool so it never blocks the event loop.
+
+    At most `max_concurrency` operations are admitted at once (queued in
+    the pool or running); further callers wait up to `queue_timeout_ms`
+    for a slot and then get PasswordHasherBusyError, which caps the number
+    of concurrent logins instead of letting a backlog build up. With
+    `workers=0` hashing runs inline on the event loop, as it used to.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        queue_timeout_ms: Optional[int] = None,
+    ):
+        self.workers = workers if workers is not None else settings.PASSWORD_HASH_WORKERS
+        self.max_concurrency = max_concurrency or settings.PASSWORD_HASH_MAX_CONCURRENCY
+        if queue_timeout_ms is None:
+            queue_timeout_ms = settings.PASSWORD_HASH_QUEUE_TIMEOUT_MS
+        self.queue_timeout = queue_timeout_ms / 1000
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Counters
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """Hash a batch, keeping at most one job per worker process in flight.
+
+        Every password takes a slot of its own, as a login does, so logins
+        queue alongside a bulk import instead of behind all of it. The
+        batch waits for slots rather than failing when the hasher is busy.
+        """
+        in_flight = asyncio.Semaphore(max(self.workers, 1))
+
+        async def hash_one(password: str) -> str:
+            async with in_flight:
+                return await self._run(hash_password, password, wait=True)
+
+        return list(await asyncio.gather(*(hash_one(password) for password in passwords)))
+
+    async def _run(self, fn: Callable, *args, wait: bool = False):
+        async with self._slot(wait):
+            executor = self._get_executor()
+            if executor is None:
+                result = fn(*args)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+            self.completed += 1
+            return result
+
+    @asynccontextmanager
+    async def _slot(self, wait: bool = False):
+        if self._semaphore.locked() and not wait:
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise PasswordHasherBusyError("Too many concurrent password operations")
+        else:
+            await self._semaphore.acquire()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+    async def start(self) -> None:
+        """Spawn the worker processes up front so the first logins don't pay for it."""
+        executor = self._get_executor()
+        if executor is None:
+            return
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(executor, _noop) for _ in range(self.workers)))
+
+    async def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+# Singleton instance
+password_hasher = ProcessPoolPasswordHasher()
@@ -0,0 +1,153 @@
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, Optional, Tuple
+from fastapi import WebSocket
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Close code sent to consumers evicted for falling behind ("Try Again Later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+# Seconds an evicted consumer gets to acknowledge the close frame
+EVICTION_CLOSE_TIMEOUT = 5.0
+
+
+class OverflowPolicy(str, Enum):
+    """What to do when a connection's outbound queue is full."""
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+class ClientConnection:
+    """A WebSocket with a bounded outbound queue drained by its own writer task.
+
+    Producers call `enqueue`, which never awaits, so a stalled client only
+    ever delays itself. When the queue is full the overflow policy decides
+    whether the oldest frame is dropped, a queued frame with the same
+    coalesce key is replaced, or the client is disconnected. Disconnecting
+    cancels the writer, which may be stuck sending to the stalled socket,
+    and closes the socket from a separate task with a timeout.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue_size: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        room_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ):
+        self.websocket = websocket
+        # Who the connection belongs to, for ConnectionManager.release
+        self.room_id = room_id
+        self.user_id = user_id
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        # Entries are (coalesce_key, frame)
+        self._queue: Deque[Tuple[Optional[str], str]] = deque()
+        self._wakeup = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+        self._close_task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.evicted = False
+        # Counters
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        """Number of frames waiting to be written."""
+        return len(self._queue)
+
+    def start(self) -> None:
+        """Start the writer task for this connection."""
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._writer())
+
+    def enqueue(self, frame: str, coalesce_key: Optional[str] = None) -> bool:
+        """Queue a frame for sending. Returns False if the connection is (now) closed."""
+        if self.closed:
+            return False
+
+        if len(self._queue) >= self.max_queue_size:
+            if self.overflow_policy == OverflowPolicy.DISCONNECT:
+                self._evict()
+                return False
+            if self.overflow_policy == OverflowPolicy.COALESCE and coalesce_key is not None:
+                for index, (key, _) in enumerate(self._queue):
+                    if key == coalesce_key:
+                        self._queue[index] = (coalesce_key, frame)
+                        self.coalesced += 1
+                        return True
+            # Drop oldest (also the fallback when nothing can be coalesced)
+            self._queue.popleft()
+            self.dropped += 1
+
+        self._queue.append((coalesce_key, frame))
+        if len(self._queue) > self.max_depth:
+            self.max_depth = len(self._queue)
+        self._wakeup.set()
+        return True
+
+    def close(self) -> None:
+        """Stop the writer task and discard any pending frames."""
+        self.closed = True
+        self._queue.clear()
+        self._wakeup.set()
+        if self._writer_task is not None and not self._writer_task.done():
+            if self._writer_task is not asyncio.current_task():
+                self._writer_task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the counters for this connection."""
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+    def _evict(self) -> None:
+        """Disconnect a slow consumer: stop its writer and close the socket."""
+        self.evicted = True
+        self.dropped += len(self._queue)
+        self.close()
+        self._close_task = asyncio.create_task(self._close_evicted())
+
+    async def _close_evicted(self) -> None:
+        logger.warning("Disconnecting slow WebSocket consumer")
+        try:
+            await asyncio.wait_for(
+                self.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE),
+                EVICTION_CLOSE_TIMEOUT
+            )
+        except Exception as e:
+            # A socket too stalled to take the close frame is dropped by the server
+            logger.debug(f"Could not close slow WebSocket consumer cleanly: {e}")
+
+    async def _writer(self) -> None:
+        """Drain the outbound queue onto the socket until closed."""
+        try:
+            while True:
+                while not self._queue:
+                    if self.closed:
+                        break
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                if self.closed and not self._queue:
+                    break
+                _, frame = self._queue.popleft()
+                await self.websocket.send_text(frame)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"WebSocket writer stopped: {e}")
+        finally:
+            self.closed = True
+            self._queue.clear()
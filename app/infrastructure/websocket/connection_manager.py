@@ -1,31 +1,123 @@
-from typing import Dict, List, Set, Optional
+from typing import Any, Dict, List, Set, Optional, Tuple, Union
 from fastapi import WebSocket
 import json
 import asyncio
-from datetime import datetime
+
+from app.infrastructure.config import get_settings
+from app.infrastructure.websocket.client_connection import ClientConnection, OverflowPolicy
+from app.infrastructure.websocket.frames import batch_frame, presence_frame
+from app.infrastructure.websocket.redis_backplane import RedisBackplane
+
+settings = get_settings()
 
 class ConnectionManager:
-    """Manages WebSocket connections and broadcasting."""
+    """Manages WebSocket connections and broadcasting.
+    
+    Every connection owns a bounded outbound queue and a writer task, so
+    broadcasting only enqueues frames and never waits on a slow client.
     
-    def __init__(self):
-        # room_id -> {user_id -> WebSocket}
-        self.active_connections: Dict[str, Dict[str, WebSocket]] = {}
+    With a batch window configured, events for a room are buffered for up
+    to `batch_window_ms` (or `batch_max_events` events) and each recipient
+    gets them as one `{"type": "batch", "events": [...]}` frame.
+    
+    Presence deltas carry the chat repository's presence version. They are
+    only relayed to other processes when that version is shared by all of
+    them (`relay_presence`); otherwise clients elsewhere would discard them
+    as stale, or skip versions of their own.
+    """
+    
+    def __init__(
+        self,
+        max_queue_size: Optional[int] = None,
+        overflow_policy: Optional[str] = None,
+        batch_window_ms: Optional[int] = None,
+        batch_max_events: Optional[int] = None,
+    ):
+        self.max_queue_size = max_queue_size or settings.WS_SEND_QUEUE_SIZE
+        self.overflow_policy = OverflowPolicy(overflow_policy or settings.WS_OVERFLOW_POLICY)
+        if batch_window_ms is None:
+            batch_window_ms = settings.WS_BATCH_WINDOW_MS
+        self.batch_window = batch_window_ms / 1000
+        self.batch_max_events = batch_max_events or settings.WS_BATCH_MAX_EVENTS
+        # room_id -> {user_id -> ClientConnection}
+        self.active_connections: Dict[str, Dict[str, ClientConnection]] = {}
         # room_id -> set of user_ids
         self.room_participants: Dict[str, Set[str]] = {}
         # user_id -> set of room_ids
         self.user_rooms: Dict[str, Set[str]] = {}
+        # Counters for connections that are already gone
+        self.evicted_total = 0
+        self._closed_dropped = 0
+        self._closed_coalesced = 0
+        # Optional cross-process relay, see attach_backplane()
+        self.backplane: Optional[RedisBackplane] = None
+        self.relay_presence = False
+        # room_id -> buffered (frame, exclude_user_id, coalesce_key) events
+        self._pending: Dict[str, List[Tuple[str, Optional[str], Optional[str]]]] = {}
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
+        self.batches_sent = 0
     
-    async def connect(self, websocket: WebSocket, room_id: str, user_id: str) -> None:
-        """Accept a new WebSocket connection and add to room."""
+    async def attach_backplane(self, backplane: RedisBackplane, relay_presence: bool = False) -> None:
+        """Relay broadcasts through a backplane so rooms span processes.
+        
+        Pass `relay_presence` only if presence versions are shared by every
+        process, as with the Redis chat repository.
+        """
+        self.backplane = backplane
+        self.relay_presence = relay_presence
+        for room_id in self.active_connections:
+            backplane.watch_room(room_id)
+        await backplane.start()
+    
+    async def detach_backplane(self) -> None:
+        """Stop relaying broadcasts to other processes."""
+        if self.backplane is not None:
+            await self.backplane.stop()
+            self.backplane = None
+            self.relay_presence = False
+    
+    async def connect(
+        self,
+        websocket: WebSocket,
+        room_id: str,
+        user_id: str,
+        presence_version: int = 0
+    ) -> ClientConnection:
+        """Accept a new WebSocket connection and add to room.
+        
+        The room is told about the new user with a small `user_joined` delta
+        stamped with `presence_version`, not the full participant list.
+        Returns the connection, which the caller hands to `release` when
+        its socket is done.
+        """
         await websocket.accept()
         
         # Initialize room if it doesn't exist
         if room_id not in self.active_connections:
             self.active_connections[room_id] = {}
             self.room_participants[room_id] = set()
+            if self.backplane is not None:
+                self.backplane.watch_room(room_id)
+        
+        # Replace any previous connection for this user in the room
+        previous = self.active_connections[room_id].get(user_id)
+        if previous is not None:
+            self._retire(previous)
+        
+        # Events buffered so far happened before the join and are in the
+        # snapshot the new user is about to get; send them without it
+        self._flush_room(room_id)
         
         # Add connection
-        self.active_connections[room_id][user_id] = websocket
+        connection = ClientConnection(
+            websocket,
+            max_queue_size=self.max_queue_size,
+            overflow_policy=self.overflow_policy,
+            room_id=room_id,
+            user_id=user_id,
+        )
+        connection.start()
+        self.active_connections[room_id][user_id] = connection
         self.room_participants[room_id].add(user_id)
         
         # Track user's rooms
@@ -33,18 +125,26 @@ class ConnectionManager:
             self.user_rooms[user_id] = set()
         self.user_rooms[user_id].add(room_id)
         
-        # Notify room about new user
-        await self.broadcast(
-            {
-                "type": "user_joined",
-                "user_id": user_id,
-                "room_id": room_id,
-                "timestamp": datetime.utcnow().isoformat(),
-                "participants": list(self.room_participants[room_id])
-            },
+        # Notify room about new user; deltas are never coalesced, as a
+        # replaced one would leave clients a version gap to refetch over
+        await self.broadcast_presence(
+            presence_frame("user_joined", room_id, user_id, presence_version),
             room_id=room_id,
             exclude_user_id=user_id
         )
+        return connection
+    
+    def release(self, connection: ClientConnection) -> bool:
+        """Remove `connection` if it is still its user's connection in the room.
+        
+        Returns False if a newer connection of the user has replaced it,
+        which is then left alone, so the user has not left the room.
+        """
+        room_id, user_id = connection.room_id, connection.user_id
+        if self.active_connections.get(room_id, {}).get(user_id) is not connection:
+            return False
+        self._remove_connection(user_id, room_id)
+        return True
     
     def disconnect(self, user_id: str, room_id: Optional[str] = None) -> None:
         """Remove a user's connection from one or all rooms."""
@@ -58,14 +158,20 @@ class ConnectionManager:
     def _remove_connection(self, user_id: str, room_id: str) -> None:
         """Internal method to remove a user from a specific room."""
         if room_id in self.active_connections and user_id in self.active_connections[room_id]:
-            # Remove the connection
-            del self.active_connections[room_id][user_id]
+            # Remove the connection and stop its writer
+            self._retire(self.active_connections[room_id].pop(user_id))
             
             # Clean up empty rooms
             if not self.active_connections[room_id]:
                 del self.active_connections[room_id]
                 if room_id in self.room_participants:
                     del self.room_participants[room_id]
+                self._pending.pop(room_id, None)
+                flush_task = self._flush_tasks.pop(room_id, None)
+                if flush_task is not None:
+                    flush_task.cancel()
+                if self.backplane is not None:
+                    self.backplane.unwatch_room(room_id)
             elif room_id in self.room_participants and user_id in self.room_participants[room_id]:
                 self.room_participants[room_id].remove(user_id)
             
@@ -75,36 +181,162 @@ class ConnectionManager:
                 if not self.user_rooms[user_id]:
                     del self.user_rooms[user_id]
     
-    async def send_personal_message(self, message: dict, user_id: str) -> None:
+    def _retire(self, connection: ClientConnection) -> None:
+        """Stop a connection's writer and fold its counters into the totals."""
+        if connection.evicted:
+            # Already closed by the eviction itself
+            self.evicted_total += 1
+        else:
+            connection.close()
+        self._closed_dropped += connection.dropped
+        self._closed_coalesced += connection.coalesced
+    
+    async def send_personal_message(self, message: Union[dict, str], user_id: str) -> None:
         """Send a message to a specific user in all their connected rooms."""
         if user_id not in self.user_rooms:
             return
-            
-        message_str = json.dumps(message)
-        tasks = []
         
-        for room_id in self.user_rooms[user_id]:
-            if room_id in self.active_connections and user_id in self.active_connections[room_id]:
-                websocket = self.active_connections[room_id][user_id]
-                tasks.append(websocket.send_text(message_str))
+        message_str = message if isinstance(message, str) else json.dumps(message)
         
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        for room_id in list(self.user_rooms[user_id]):
+            connection = self.active_connections.get(room_id, {}).get(user_id)
+            if connection is not None and not connection.enqueue(message_str):
+                self._remove_connection(user_id, room_id)
     
-    async def broadcast(self, message: dict, room_id: str, exclude_user_id: str = None) -> None:
-        """Broadcast a message to all users in a room."""
+    async def send_to_connection(self, message: Union[dict, str], room_id: str, user_id: str) -> None:
+        """Queue a message for a single user's connection in one room.
+        
+        The room's buffered events are flushed first, so they cannot arrive
+        after this message (say a room snapshot that already reflects them).
+        """
+        connection = self.active_connections.get(room_id, {}).get(user_id)
+        if connection is None:
+            return
+        
+        self._flush_room(room_id)
+        message_str = message if isinstance(message, str) else json.dumps(message)
+        if not connection.enqueue(message_str):
+            self._remove_connection(user_id, room_id)
+    
+    async def broadcast(
+        self,
+        message: Union[dict, str],
+        room_id: str,
+        exclude_user_id: str = None,
+        coalesce_key: Optional[str] = None
+    ) -> None:
+        """Broadcast a message to all users in a room.
+        
+        `message` may be a dict or an already encoded JSON frame. Frames are
+        only enqueued; each connection's writer sends them. Frames sharing a
+        `coalesce_key` may replace each other under the coalesce overflow
+        policy. With a backplane attached the frame is also published to the
+        other processes serving the room.
+        """
+        message_str = message if isinstance(message, str) else json.dumps(message)
+        await self.deliver_local(message_str, room_id, exclude_user_id, coalesce_key)
+        if self.backplane is not None:
+            await self.backplane.publish(message_str, room_id, exclude_user_id, coalesce_key)
+    
+    async def broadcast_presence(
+        self,
+        message: Union[dict, str],
+        room_id: str,
+        exclude_user_id: str = None
+    ) -> None:
+        """Broadcast a presence delta, to other processes only if `relay_presence`."""
+        if self.relay_presence:
+            await self.broadcast(message, room_id, exclude_user_id)
+        else:
+            message_str = message if isinstance(message, str) else json.dumps(message)
+            await self.deliver_local(message_str, room_id, exclude_user_id)
+    
+    async def deliver_local(
+        self,
+        message_str: str,
+        room_id: str,
+        exclude_user_id: str = None,
+        coalesce_key: Optional[str] = None
+    ) -> None:
+        """Enqueue an encoded frame for the connections held by this process."""
         if room_id not in self.active_connections:
             return
-            
-        message_str = json.dumps(message)
-        tasks = []
         
-        for user_id, connection in self.active_connections[room_id].items():
+        if self.batch_window <= 0:
+            self._fan_out(message_str, room_id, exclude_user_id, coalesce_key)
+            return
+        
+        pending = self._pending.setdefault(room_id, [])
+        pending.append((message_str, exclude_user_id, coalesce_key))
+        if len(pending) >= self.batch_max_events:
+            self._flush_room(room_id)
+        elif room_id not in self._flush_tasks:
+            self._flush_tasks[room_id] = asyncio.create_task(self._flush_later(room_id))
+    
+    def _fan_out(
+        self,
+        message_str: str,
+        room_id: str,
+        exclude_user_id: Optional[str] = None,
+        coalesce_key: Optional[str] = None
+    ) -> None:
+        """Enqueue a frame on every connection in the room."""
+        closed = []
+        
+        for user_id, connection in self.active_connections.get(room_id, {}).items():
             if user_id != exclude_user_id:  # Skip excluded user
-                tasks.append(connection.send_text(message_str))
+                if not connection.enqueue(message_str, coalesce_key):
+                    closed.append(user_id)
         
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        for user_id in closed:
+            self._remove_connection(user_id, room_id)
+    
+    async def _flush_later(self, room_id: str) -> None:
+        """Flush a room's buffered events once the batch window has passed."""
+        await asyncio.sleep(self.batch_window)
+        self._flush_tasks.pop(room_id, None)
+        self._flush_room(room_id)
+    
+    def _flush_room(self, room_id: str) -> None:
+        """Send a room's buffered events, one batch frame per recipient."""
+        flush_task = self._flush_tasks.pop(room_id, None)
+        if flush_task is not None and flush_task is not asyncio.current_task():
+            flush_task.cancel()
+        events = self._pending.pop(room_id, None)
+        if not events:
+            return
+        if len(events) == 1:
+            frame, exclude_user_id, coalesce_key = events[0]
+            self._fan_out(frame, room_id, exclude_user_id, coalesce_key)
+            return
+        
+        keys = {key for _, _, key in events}
+        coalesce_key = keys.pop() if len(keys) == 1 else None
+        excluded = {exclude for _, exclude, _ in events if exclude is not None}
+        shared_frame = batch_frame([frame for frame, _, _ in events])
+        closed = []
+        
+        for user_id, connection in self.active_connections.get(room_id, {}).items():
+            frame = shared_frame
+            if user_id in excluded:
+                # Only recipients excluded from some event need their own batch
+                frames = [f for f, exclude, _ in events if exclude != user_id]
+                if not frames:
+                    continue
+                frame = frames[0] if len(frames) == 1 else batch_frame(frames)
+            if not connection.enqueue(frame, coalesce_key):
+                closed.append(user_id)
+        self.batches_sent += 1
+        
+        for user_id in closed:
+            self._remove_connection(user_id, room_id)
+    
+    async def shutdown(self) -> None:
+        """Close every connection and stop all writer tasks."""
+        for room_id in list(self.active_connections):
+            for user_id in list(self.active_connections.get(room_id, {})):
+                self._remove_connection(user_id, room_id)
+        await asyncio.sleep(0)
     
     def get_room_participants(self, room_id: str) -> List[str]:
         """Get list of user IDs in a room."""
@@ -113,6 +345,27 @@ class ConnectionManager:
     def get_user_rooms(self, user_id: str) -> List[str]:
         """Get list of room IDs a user is in."""
         return list(self.user_rooms.get(user_id, []))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue depth and drop counters across all connections."""
+        connections = [
+            connection
+            for room in self.active_connections.values()
+            for connection in room.values()
+        ]
+        return {
+            "connections": len(connections),
+            "rooms": len(self.active_connections),
+            "queued": sum(c.depth for c in connections),
+            "max_queue_depth": max((c.max_depth for c in connections), default=0),
+            "sent": sum(c.sent for c in connections),
+            "dropped": self._closed_dropped + sum(c.dropped for c in connections),
+            "coalesced": self._closed_coalesced + sum(c.coalesced for c in connections),
+            "evicted": self.evicted_total,
+            "batches_sent": self.batches_sent,
+            "overflow_policy": self.overflow_policy.value,
+            "backplane_node_id": self.backplane.node_id if self.backplane else None,
+        }
 
 # Singleton instance
 manager = ConnectionManager()
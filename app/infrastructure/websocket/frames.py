@@ -0,0 +1,56 @@
+from typing import Iterable, List, Optional
+from datetime import datetime
+import json
+
+from app.domain.entities.chat import ChatMessage, ChatRoom
+
+# Outbound WebSocket frames are assembled from pre-encoded parts so that a
+# message is serialized once, no matter how many recipients or history
+# snapshots it ends up in.
+
+
+def message_frame(message: ChatMessage, sender_id: str) -> str:
+    """Build the `message` frame broadcast when a chat message is sent."""
+    return (
+        '{"type":"message","message":' + message.to_json()
+        + ',"sender_id":' + json.dumps(sender_id) + '}'
+    )
+
+
+def room_info_frame(
+    room: Optional[ChatRoom],
+    participants: List[str],
+    messages: Iterable[ChatMessage],
+    presence_version: int = 0,
+    participants_cursor: Optional[str] = None
+) -> str:
+    """Build the `room_info` snapshot sent to a client when it joins a room.
+    
+    `participants` is the first page of the member list; when the room is
+    larger, `participants_cursor` lets the client page through the rest.
+    """
+    room_json = room.model_dump_json(exclude={"participants"}) if room else "null"
+    messages_json = ",".join(message.to_json() for message in messages)
+    return (
+        '{"type":"room_info","room":' + room_json
+        + ',"participants":' + json.dumps(participants)
+        + ',"participants_cursor":' + json.dumps(participants_cursor)
+        + ',"presence_version":' + str(presence_version)
+        + ',"messages":[' + messages_json + ']}'
+    )
+
+
+def presence_frame(event_type: str, room_id: str, user_id: str, presence_version: int) -> str:
+    """Build a `user_joined`/`user_left` delta carrying the room's presence version."""
+    return json.dumps({
+        "type": event_type,
+        "user_id": user_id,
+        "room_id": room_id,
+        "timestamp": datetime.utcnow().isoformat(),
+        "presence_version": presence_version,
+    })
+
+
+def batch_frame(frames: List[str]) -> str:
+    """Wrap several encoded event frames into a single `batch` frame."""
+    return '{"type":"batch","events":[' + ",".join(frames) + ']}'
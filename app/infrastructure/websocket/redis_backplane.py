@@ -0,0 +1,152 @@
+from typing import Optional, Set, TYPE_CHECKING
+from uuid import uuid4
+import asyncio
+import json
+import logging
+
+from app.infrastructure.redis.redis_client import RedisClient
+
+if TYPE_CHECKING:
+    from app.infrastructure.websocket.connection_manager import ConnectionManager
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "chat:room:"
+
+
+class RedisBackplane:
+    """Relays room broadcasts between worker processes over Redis pub/sub.
+
+    Every room with at least one local member is subscribed to its own
+    channel. Published envelopes carry the id of the node that sent them,
+    so a node ignores its own messages (it has already delivered them to
+    its local sockets) and only relays frames coming from other nodes.
+
+    Envelope format: a JSON header line followed by the raw frame, so the
+    frame does not have to be escaped into another JSON document.
+    """
+
+    def __init__(self, manager: "ConnectionManager", node_id: Optional[str] = None):
+        self.manager = manager
+        self.node_id = node_id or uuid4().hex
+        self._pubsub = None
+        self._listener_task: Optional[asyncio.Task] = None
+        # Rooms that should be subscribed vs. rooms that currently are
+        self._wanted_rooms: Set[str] = set()
+        self._subscribed_rooms: Set[str] = set()
+        self._sync_lock = asyncio.Lock()
+        self._has_subscriptions = asyncio.Event()
+
+    @staticmethod
+    def channel_for(room_id: str) -> str:
+        return f"{CHANNEL_PREFIX}{room_id}"
+
+    async def start(self) -> None:
+        """Open the pub/sub connection and start relaying messages."""
+        redis_client = await RedisClient.get_redis()
+        self._pubsub = redis_client.pubsub()
+        self._listener_task = asyncio.create_task(self._listen())
+        # Pick up rooms that became active before the backplane started
+        await self._sync_subscriptions()
+
+    async def stop(self) -> None:
+        """Stop relaying and close the pub/sub connection."""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        if self._pubsub is not None:
+            await self._pubsub.close()
+            self._pubsub = None
+        self._subscribed_rooms.clear()
+
+    def watch_room(self, room_id: str) -> None:
+        """Subscribe to a room's channel (called when it gains a local member)."""
+        self._wanted_rooms.add(room_id)
+        self._schedule_sync()
+
+    def unwatch_room(self, room_id: str) -> None:
+        """Unsubscribe from a room's channel (called when its last local member leaves)."""
+        self._wanted_rooms.discard(room_id)
+        self._schedule_sync()
+
+    async def publish(
+        self,
+        frame: str,
+        room_id: str,
+        exclude_user_id: Optional[str] = None,
+        coalesce_key: Optional[str] = None
+    ) -> None:
+        """Publish a frame to every other node with members in the room."""
+        header = json.dumps({
+            "origin": self.node_id,
+            "exclude": exclude_user_id,
+            "coalesce": coalesce_key,
+        })
+        try:
+            redis_client = await RedisClient.get_redis()
+            await redis_client.publish(self.channel_for(room_id), header + "\n" + frame)
+        except Exception as e:
+            logger.error(f"Failed to publish to room {room_id}: {e}")
+
+    def _schedule_sync(self) -> None:
+        if self._pubsub is not None:
+            asyncio.create_task(self._sync_subscriptions())
+
+    async def _sync_subscriptions(self) -> None:
+        """Bring the pub/sub subscriptions in line with the wanted rooms."""
+        async with self._sync_lock:
+            if self._pubsub is None:
+                return
+            to_add = self._wanted_rooms - self._subscribed_rooms
+            to_remove = self._subscribed_rooms - self._wanted_rooms
+            try:
+                if to_add:
+                    await self._pubsub.subscribe(*(self.channel_for(r) for r in to_add))
+                    self._subscribed_rooms |= to_add
+                if to_remove:
+                    await self._pubsub.unsubscribe(*(self.channel_for(r) for r in to_remove))
+                    self._subscribed_rooms -= to_remove
+            except Exception as e:
+                logger.error(f"Failed to update backplane subscriptions: {e}")
+            if self._subscribed_rooms:
+                self._has_subscriptions.set()
+            else:
+                self._has_subscriptions.clear()
+
+    async def _listen(self) -> None:
+        """Deliver frames published by other nodes to local sockets."""
+        while True:
+            try:
+                if not self._pubsub.subscribed:
+                    await self._has_subscriptions.wait()
+                    if not self._pubsub.subscribed:
+                        await asyncio.sleep(0.1)
+                    continue
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+                if message is None or message.get("type") != "message":
+                    continue
+                await self._handle(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Backplane listener error: {e}")
+                await asyncio.sleep(1)
+
+    async def _handle(self, channel: str, data: str) -> None:
+        header_json, _, frame = data.partition("\n")
+        header = json.loads(header_json)
+        if header.get("origin") == self.node_id:
+            return
+        room_id = channel[len(CHANNEL_PREFIX):]
+        await self.manager.deliver_local(
+            frame,
+            room_id=room_id,
+            exclude_user_id=header.get("exclude"),
+            coalesce_key=header.get("coalesce")
+        )
@@ -1,11 +1,21 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 import os
 
 from app.infrastructure.config import get_settings
 from app.presentation.api.v1.routers import auth, users
 from app.presentation.api.v1.endpoints import chat
+from app.presentation.api import metrics
+from app.presentation.middleware.query_stats import QueryStatsMiddleware
+from app.infrastructure.websocket.connection_manager import manager as connection_manager
+from app.infrastructure.websocket.redis_backplane import RedisBackplane
+from app.infrastructure.cache.user_cache import user_cache
+from app.infrastructure.security.password_hasher import password_hasher, PasswordHasherBusyError
+from app.infrastructure.kafka.consumer_service import consumer_service
+from app.infrastructure.kafka.event_publisher import event_publisher
+from app.infrastructure.kafka.producer import KafkaProducer
 
 settings = get_settings()
 
@@ -25,15 +35,69 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Report query count and database time per request
+    application.add_middleware(QueryStatsMiddleware)
+
     # Include routers
     application.include_router(auth.router, prefix="/api/v1", tags=["auth"])
-    application.include_router(users.router, prefix="/api/v1/users", tags=["users"])
-    application.include_router(chat.router, prefix="/api/v1/chat", tags=["chat"])
+    application.include_router(users.router, prefix="/api/v1", tags=["users"])
+    application.include_router(chat.router, prefix="/api/v1", tags=["chat"])
+    application.include_router(metrics.router)
+    
+    # Shed logins and registrations once the password hashing pool is saturated
+    @application.exception_handler(PasswordHasherBusyError)
+    async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusyError):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc)},
+            headers={"Retry-After": "1"},
+        )
     
     # Mount static files for WebSocket demo
     os.makedirs("static", exist_ok=True)
     application.mount("/static", StaticFiles(directory="static"), name="static")
 
+    # Relay room broadcasts between worker processes
+    if settings.WS_BACKPLANE == "redis":
+        async def start_backplane():
+            # Other repositories count presence versions per process
+            await connection_manager.attach_backplane(
+                RedisBackplane(connection_manager),
+                relay_presence=settings.CHAT_REPOSITORY == "redis"
+            )
+
+        application.add_event_handler("startup", start_backplane)
+        application.add_event_handler("shutdown", connection_manager.detach_backplane)
+
+    # Spawn the password hashing workers before the first login
+    application.add_event_handler("startup", password_hasher.start)
+    application.add_event_handler("shutdown", password_hasher.shutdown)
+
+    # Drop cached users invalidated by other processes
+    if settings.USER_CACHE_ENABLED:
+        application.add_event_handler("startup", user_cache.start)
+        application.add_event_handler("shutdown", user_cache.stop)
+
+    # Publish domain events in the background; shutdown delivers what is buffered
+    if settings.EVENTS_ENABLED:
+        application.add_event_handler("startup", event_publisher.start)
+        application.add_event_handler("shutdown", event_publisher.stop)
+
+    # Consume Kafka events in this process; dedicated workers use scripts/run_consumer.py
+    if settings.KAFKA_CONSUMER_ENABLED:
+        application.add_event_handler("startup", consumer_service.start)
+        application.add_event_handler("shutdown", consumer_service.stop)
+
+    # Restore chat history before the first connection
+    application.add_event_handler("startup", chat.start_chat_repository)
+
+    # Stop WebSocket writer tasks and flush buffered chat messages on shutdown
+    application.add_event_handler("shutdown", connection_manager.shutdown)
+    application.add_event_handler("shutdown", chat.close_chat_repository)
+
+    # Flush the shared Kafka producer once every publisher has stopped
+    application.add_event_handler("shutdown", KafkaProducer.close)
+
     return application
 
 app = create_application()
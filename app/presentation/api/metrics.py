@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.infrastructure.database.instrumentation import query_metrics
+from app.infrastructure.kafka.event_publisher import event_publisher
+from app.infrastructure.redis.redis_client import RedisClient
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Expose database, Redis pool and event publishing metrics in the Prometheus text format."""
+    lines = query_metrics.render_prometheus() + RedisClient.render_prometheus() + event_publisher.render_prometheus()
+    return PlainTextResponse(
+        "\n".join(lines) + "\n",
+        media_type="text/plain; version=0.0.4"
+    )
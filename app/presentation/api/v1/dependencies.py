@@ -5,23 +5,39 @@ from typing import Optional
 from app.infrastructure.database import get_db, AsyncSession
 from app.infrastructure.config import get_settings
 from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.repositories.cached_user_repository import CachedUserRepository
+from app.infrastructure.cache.principal_cache import principal_cache
+from app.infrastructure.cache.user_cache import user_cache
+from app.infrastructure.security.password_hasher import password_hasher
+from app.infrastructure.kafka.event_publisher import event_publisher
+from app.domain.interfaces.repositories.user_repository import IUserRepository
+from app.domain.interfaces.events.event_publisher import IEventPublisher
+from app.domain.entities.user import UserInDB
 from app.domain.use_cases.user_use_case import UserUseCase
 
 settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
 
 # Dependency
-def get_user_repository(db: AsyncSession = Depends(get_db)) -> UserRepository:
-    return UserRepository(db)
+def get_user_repository(db: AsyncSession = Depends(get_db)) -> IUserRepository:
+    if settings.USER_CACHE_ENABLED:
+        return CachedUserRepository(UserRepository(db, password_hasher), user_cache, db)
+    return UserRepository(db, password_hasher)
 
 # Dependency
-def get_user_use_case(user_repo: UserRepository = Depends(get_user_repository)) -> UserUseCase:
-    return UserUseCase(user_repo)
+def get_event_publisher() -> Optional[IEventPublisher]:
+    return event_publisher if settings.EVENTS_ENABLED else None
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    user_use_case: UserUseCase = Depends(get_user_use_case)
-):
+# Dependency
+def get_user_use_case(user_repo: IUserRepository = Depends(get_user_repository)) -> UserUseCase:
+    return UserUseCase(user_repo, password_hasher, principal_cache, get_event_publisher())
+
+async def get_user_from_token(token: str, user_use_case: UserUseCase) -> UserInDB:
+    """Resolve a bearer token to its user, serving repeat tokens from the principal cache."""
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached.user
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -38,11 +54,28 @@ async def get_current_user(
     user = await user_use_case.get_user_by_email(username)
     if user is None:
         raise credentials_exception
+    principal_cache.put(token, payload, user)
     return user
 
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    user_use_case: UserUseCase = Depends(get_user_use_case)
+):
+    return await get_user_from_token(token, user_use_case)
+
 async def get_current_active_user(
     current_user: UserUseCase = Depends(get_current_user)
 ):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+async def get_current_superuser(
+    current_user: UserInDB = Depends(get_current_active_user)
+):
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return current_user
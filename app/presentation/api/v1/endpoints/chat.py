@@ -1,26 +1,59 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, status
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query, status
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from typing import List, Optional, Callable, Dict, Any
+from functools import lru_cache
 import json
 import logging
 from uuid import uuid4
 
-from app.domain.entities.chat import ChatMessage, ChatRoom
+from app.domain.entities.chat import ChatMessage, ChatRoom, MessageCursor
 from app.domain.use_cases.chat_use_case import ChatUseCase
 from app.domain.interfaces.repositories.chat_repository import ChatRepository
+from app.infrastructure.config import get_settings
 from app.infrastructure.repositories.chat_repository import InMemoryChatRepository
+from app.infrastructure.repositories.kafka_chat_log_repository import KafkaChatLogRepository
+from app.infrastructure.repositories.redis_chat_repository import RedisChatRepository
+from app.infrastructure.repositories.write_behind_chat_repository import WriteBehindChatRepository
 from app.infrastructure.websocket.connection_manager import manager as connection_manager
-from app.presentation.api.v1.dependencies.auth import get_current_user
+from app.infrastructure.websocket.frames import message_frame, presence_frame, room_info_frame
+from app.domain.use_cases.user_use_case import UserUseCase
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.cache.principal_cache import principal_cache
+from app.infrastructure.security.password_hasher import password_hasher
+from app.presentation.api.v1.dependencies import get_event_publisher, get_user_from_token, get_user_repository
+
+settings = get_settings()
+
+@lru_cache()
+def _chat_repository() -> ChatRepository:
+    """Build the process-wide chat repository selected by CHAT_REPOSITORY."""
+    if settings.CHAT_REPOSITORY == "redis":
+        repository = RedisChatRepository()
+    elif settings.CHAT_LOG_ENABLED:
+        repository = KafkaChatLogRepository(InMemoryChatRepository())
+    else:
+        repository = InMemoryChatRepository()
+    if settings.CHAT_WRITE_BEHIND:
+        repository = WriteBehindChatRepository(repository)
+    return repository
 
 # Dependency for getting the chat repository
 async def get_chat_repository() -> ChatRepository:
-    return InMemoryChatRepository()
+    return _chat_repository()
+
+async def start_chat_repository() -> None:
+    """Restore persisted chat history on startup."""
+    await _chat_repository().start()
+
+async def close_chat_repository() -> None:
+    """Flush pending writes of the shared chat repository on shutdown."""
+    await _chat_repository().close()
 
 # Dependency for getting the chat use case
 async def get_chat_use_case(
     repository: ChatRepository = Depends(get_chat_repository)
 ) -> ChatUseCase:
-    return ChatUseCase(repository)
+    return ChatUseCase(repository, get_event_publisher())
 
 logger = logging.getLogger(__name__)
 
@@ -41,30 +74,40 @@ async def websocket_endpoint(
         token: JWT token for authentication
     """
     try:
-        # Authenticate user
-        user = await get_current_user(token)
+        # Authenticate user; the session is only held for the lookup
+        async with AsyncSessionLocal() as db:
+            user = await get_user_from_token(token, UserUseCase(get_user_repository(db), password_hasher, principal_cache))
         user_id = str(user.id)
         
         # Get the chat use case
-        # chat_use_case = await get_chat_use_case()
+        chat_use_case = await get_chat_use_case(await get_chat_repository())
         
-        # Connect to the room
-        await connection_manager.connect(websocket, room_id, user_id)
+        # Join the room; the new presence version stamps the join delta
+        presence_version = await chat_use_case.join_room(room_id, user_id)
+        connection = None
         
         try:
-            # Join the room
-            await chat_use_case.join_room(room_id, user_id)
+            # Connect to the room
+            connection = await connection_manager.connect(websocket, room_id, user_id, presence_version)
             
-            # Send room info and recent messages
+            # Send room info, the first page of participants and recent messages
             room = await chat_use_case.get_room(room_id)
+            participants, participants_cursor = await chat_use_case.get_participants(
+                room_id, settings.CHAT_PRESENCE_SNAPSHOT_LIMIT
+            )
             messages = await chat_use_case.get_room_messages(room_id)
             
-            await websocket.send_text(json.dumps({
-                "type": "room_info",
-                "room": room.dict() if room else None,
-                "participants": connection_manager.get_room_participants(room_id),
-                "messages": [msg.dict() for msg in messages]
-            }))
+            await connection_manager.send_to_connection(
+                room_info_frame(
+                    room,
+                    participants,
+                    messages,
+                    presence_version=presence_version,
+                    participants_cursor=participants_cursor
+                ),
+                room_id=room_id,
+                user_id=user_id
+            )
             
             # Handle incoming messages
             while True:
@@ -82,11 +125,7 @@ async def websocket_endpoint(
                         
                         # Broadcast to all in the room
                         await connection_manager.broadcast(
-                            {
-                                "type": "message",
-                                "message": message.dict(),
-                                "sender_id": user_id
-                            },
+                            message_frame(message, user_id),
                             room_id=room_id
                         )
                     
@@ -100,21 +139,15 @@ async def websocket_endpoint(
         except Exception as e:
             logger.error(f"WebSocket error: {e}")
         finally:
-            # Clean up on disconnect
-            connection_manager.disconnect(user_id, room_id)
-            chat_use_case = await get_chat_use_case()
-            await chat_use_case.leave_room(room_id, user_id)
-            
-            # Notify room about user leaving
-            await connection_manager.broadcast(
-                {
-                    "type": "user_left",
-                    "user_id": user_id,
-                    "room_id": room_id,
-                    "participants": connection_manager.get_room_participants(room_id)
-                },
-                room_id=room_id
-            )
+            # Clean up on disconnect, unless a newer connection of the user took over
+            if connection is None or connection_manager.release(connection):
+                presence_version = await chat_use_case.leave_room(room_id, user_id)
+                
+                # Notify room about user leaving
+                await connection_manager.broadcast_presence(
+                    presence_frame("user_left", room_id, user_id, presence_version),
+                    room_id=room_id
+                )
     
     except HTTPException as e:
         logger.error(f"Authentication failed: {e.detail}")
@@ -141,12 +174,68 @@ async def create_room(
     """Create a new chat room."""
     return await chat_use_case.create_room(name)
 
-@router.get("/rooms/{room_id}/messages", response_model=List[dict])
+@router.get("/rooms/{room_id}/participants")
+async def get_participants(
+    room_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    chat_use_case: ChatUseCase = Depends(get_chat_use_case)
+):
+    """Page through the participants of a room, e.g. to resync presence in large rooms."""
+    try:
+        participants, next_cursor = await chat_use_case.get_participants(room_id, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return {"participants": participants, "next_cursor": next_cursor}
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[MessageCursor]:
+    if cursor is None:
+        return None
+    try:
+        return MessageCursor.decode(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/rooms/{room_id}/messages", response_model=List[ChatMessage])
 async def get_messages(
     room_id: str, 
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=10000),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    stream: bool = False,
     chat_use_case: ChatUseCase = Depends(get_chat_use_case)
 ):
-    """Get messages from a specific room."""
-    messages = await chat_use_case.get_room_messages(room_id, limit)
-    return [msg.dict() for msg in messages]
+    """
+    Get messages from a specific room, most recent first.
+    
+    `before` and `after` are opaque cursors from the `X-Next-Cursor` and
+    `X-Prev-Cursor` headers of a previous page. With `stream=true` the
+    messages are sent as NDJSON while they are read from the repository;
+    a stream with only `after` runs forward from it, oldest first.
+    """
+    before_cursor = _parse_cursor(before)
+    after_cursor = _parse_cursor(after)
+    
+    if stream:
+        async def ndjson():
+            async for message in chat_use_case.stream_room_messages(
+                room_id, limit, before=before_cursor, after=after_cursor
+            ):
+                yield message.to_json() + "\n"
+        
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+    
+    messages = await chat_use_case.get_room_messages(
+        room_id, limit, before=before_cursor, after=after_cursor
+    )
+    headers = {}
+    if messages:
+        headers["X-Prev-Cursor"] = MessageCursor.from_message(messages[0]).encode()
+        if len(messages) == limit:
+            headers["X-Next-Cursor"] = MessageCursor.from_message(messages[-1]).encode()
+    # Messages carry their own cached JSON, so skip response_model re-validation
+    return Response(
+        content="[" + ",".join(message.to_json() for message in messages) + "]",
+        media_type="application/json",
+        headers=headers
+    )
@@ -1,15 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from app.domain.entities.user import UserInDB, UserUpdate, UserCreate
-from app.presentation.api.v1.dependencies import get_current_active_user, get_user_use_case
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
+from datetime import datetime
+from typing import List, Optional
+from app.domain.entities.user import UserInDB, UserUpdate, UserCreate, UserSummary, UserImportResult
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.importers.user_records import iter_user_records
+from app.infrastructure.security.password_hasher import password_hasher
+from app.presentation.api.v1.dependencies import get_current_active_user, get_current_superuser, get_user_repository, get_user_use_case
 from app.domain.use_cases.user_use_case import UserUseCase
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+@router.get("", response_model=List[UserSummary])
+async def list_users(
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[int] = Query(None, description="Id of the last user of the previous page"),
+    is_active: Optional[bool] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    stream: bool = False,
+    current_user: UserInDB = Depends(get_current_superuser),
+    user_use_case: UserUseCase = Depends(get_user_use_case)
+):
+    """
+    List users in id order, or in creation order when filtered by date. Admins only.
+    
+    Pages are keyed on the user id (and its creation time, with a date
+    filter), so deep pages cost the same as the first: pass the
+    `X-Next-Cursor` header of a page as `after` to get the next one. With
+    `stream=true` every matching user after `after` is sent as NDJSON, for
+    exports.
+    """
+    filters = dict(is_active=is_active, created_after=created_after, created_before=created_before)
+    if stream:
+        async def ndjson():
+            # The request's session is closed before the body is streamed
+            async with AsyncSessionLocal() as db:
+                export_use_case = UserUseCase(get_user_repository(db), password_hasher)
+                async for user in export_use_case.stream_users(after_id=after, **filters):
+                    yield user.model_dump_json() + "\n"
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+    
+    try:
+        users = await user_use_case.list_users(limit, after_id=after, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {}
+    if len(users) == limit:
+        headers["X-Next-Cursor"] = str(users[-1].id)
+    return Response(
+        content="[" + ",".join(user.model_dump_json() for user in users) + "]",
+        media_type="application/json",
+        headers=headers
+    )
+
 @router.get("/me", response_model=UserInDB)
 async def read_users_me(current_user: UserInDB = Depends(get_current_active_user)):
     return current_user
 
+@router.post("/import", response_model=UserImportResult)
+async def import_users(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+    on_conflict: str = Query("ignore", pattern="^(ignore|upsert)$"),
+    chunk_size: int = Query(1000, ge=1, le=5000),
+    current_user: UserInDB = Depends(get_current_superuser),
+    user_use_case: UserUseCase = Depends(get_user_use_case)
+):
+    """Create users in bulk from a streamed CSV (with header) or NDJSON request body. Admins only."""
+    records = iter_user_records(request.stream(), format)
+    return await user_use_case.import_users(records, on_conflict=on_conflict, chunk_size=chunk_size)
+
 @router.get("/{user_id}", response_model=UserInDB)
 async def read_user(
     user_id: int,
@@ -0,0 +1,53 @@
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.infrastructure.config import get_settings
+from app.infrastructure.database.instrumentation import start_request
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class QueryStatsMiddleware:
+    """Reports the database work done for each HTTP request.
+    
+    The query count and total database time go into the `X-DB-Query-Count`
+    and `X-DB-Time-Ms` response headers and into one log line per request,
+    along with any statement repeated often enough to suggest an N+1
+    pattern. Queries made while a body is streamed appear in the log only.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.n_plus_one_threshold = settings.DB_N_PLUS_ONE_THRESHOLD
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        stats = start_request()
+        started = time.perf_counter()
+        status_code = 500
+        
+        async def send_with_stats(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.duration * 1000:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"{scope['method']} {scope['path']} {status_code} "
+                f"{elapsed * 1000:.1f}ms db_queries={stats.count} db_time={stats.duration * 1000:.1f}ms"
+            )
+            for statement, count in stats.repeated(self.n_plus_one_threshold).items():
+                logger.warning(f"Possible N+1 in {scope['method']} {scope['path']}: {count}x {statement}")
@@ -0,0 +1,212 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+PASSWORD = "correct horse battery staple"
+
+def configure_environment(url: str):
+    """Point the settings at the benchmark database before the app is imported.
+
+    The engine is built from the settings at import time. Everything the
+    app would otherwise reach over the network (Redis-backed caches and
+    chat, the WebSocket backplane) is switched to its in-process variant.
+    """
+    from sqlalchemy import make_url
+
+    parsed = make_url(url)
+    os.environ["DATABASE_URL"] = url
+    os.environ["DATABASE_SYNC_URL"] = parsed.set(drivername=parsed.get_backend_name()).render_as_string(hide_password=False)
+    os.environ["DATABASE_REPLICA_URLS"] = ""
+    os.environ["USER_CACHE_ENABLED"] = "false"
+    os.environ["WS_BACKPLANE"] = "none"
+    os.environ["CHAT_REPOSITORY"] = "memory"
+    # SQLite serializes writers; don't log every queued UPDATE as slow
+    os.environ.setdefault("DB_SLOW_QUERY_SAMPLE_RATE", "0")
+    os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+    os.environ.setdefault("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
+    os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def run_scenario(client, build_request, requests: int, concurrency: int):
+    """Send `requests` requests from `concurrency` concurrent clients.
+
+    `build_request(i)` returns the keyword arguments of client.request
+    for the i-th request. Returns the summary and the responses in order.
+    """
+    remaining = iter(range(requests))
+    latencies = []
+    queries = []
+    errors = 0
+    responses = [None] * requests
+
+    async def worker():
+        nonlocal errors
+        for i in remaining:
+            start = time.perf_counter()
+            response = await client.request(**build_request(i))
+            latencies.append(time.perf_counter() - start)
+            queries.append(int(response.headers.get("x-db-query-count", 0)))
+            if response.status_code >= 400:
+                errors += 1
+            responses[i] = response
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        "requests": requests,
+        "errors": errors,
+        "throughput": requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "queries_per_request": sum(queries) / requests,
+    }
+    return summary, responses
+
+async def bench(requests: int, concurrency: int):
+    import httpx
+
+    from app.infrastructure.database import Base, async_engine
+    from app.infrastructure.database.models.user import User  # noqa: F401 (registers the table)
+    from app.main import create_application
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    application = create_application()
+    results = {}
+    transport = httpx.ASGITransport(app=application)
+    # The ASGI transport does not send lifespan events, so run startup and shutdown here
+    async with application.router.lifespan_context(application):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            results["register"], responses = await run_scenario(client, lambda i: {
+                "method": "POST",
+                "url": "/api/v1/auth/register",
+                "json": {"email": f"bench{i}@example.com", "username": f"bench{i}", "password": PASSWORD},
+            }, requests, concurrency)
+            user_ids = [response.json()["id"] for response in responses if response.status_code == 201]
+            if not user_ids:
+                raise SystemExit(f"Registration failed: {responses[0].status_code} {responses[0].text}")
+
+            results["token"], responses = await run_scenario(client, lambda i: {
+                "method": "POST",
+                "url": "/api/v1/auth/token",
+                "data": {"username": f"bench{i % len(user_ids)}@example.com", "password": PASSWORD},
+            }, requests, concurrency)
+            # One token per user, in registration order
+            tokens = [response.json()["access_token"] for response in responses[:len(user_ids)]]
+
+            def authorized(i):
+                return {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+
+            results["me"], _ = await run_scenario(client, lambda i: {
+                "method": "GET",
+                "url": "/api/v1/users/me",
+                "headers": authorized(i),
+            }, requests, concurrency)
+
+            results["update"], _ = await run_scenario(client, lambda i: {
+                "method": "PUT",
+                "url": f"/api/v1/users/{user_ids[i % len(user_ids)]}",
+                "json": {"full_name": f"Bench User {i}"},
+                "headers": authorized(i),
+            }, requests, concurrency)
+
+    await async_engine.dispose()
+    return results
+
+def compare(results, baseline, threshold: float) -> int:
+    """Print the change against `baseline`; return the number of regressions.
+
+    Throughput may drop and p95 latency may grow by `threshold` percent
+    before it counts. Queries per request are deterministic, so any
+    increase is a regression.
+    """
+    regressions = 0
+    print(f"\n{'scenario':<10} {'throughput':>12} {'p95':>10} {'queries':>9}  vs baseline")
+    for name, current in results.items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        throughput = (current["throughput"] / base["throughput"] - 1) * 100
+        p95 = (current["p95_ms"] / base["p95_ms"] - 1) * 100
+        queries = current["queries_per_request"] - base["queries_per_request"]
+        problems = []
+        if throughput < -threshold:
+            problems.append("throughput")
+        if p95 > threshold:
+            problems.append("p95")
+        if queries > 0.01:
+            problems.append("queries")
+        if current["errors"]:
+            problems.append("errors")
+        regressions += bool(problems)
+        flag = f"  <-- regressed: {', '.join(problems)}" if problems else ""
+        print(f"{name:<10} {throughput:+11.1f}% {p95:+9.1f}% {queries:+9.2f}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the auth and user endpoints in-process")
+    parser.add_argument("--url", default=None,
+                        help="Async database URL, e.g. a throwaway Postgres (tables are dropped and "
+                             "recreated); defaults to a temporary SQLite file")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="Allowed throughput drop or p95 growth against the baseline, in percent")
+    args = parser.parse_args()
+
+    database = None
+    url = args.url
+    if url is None:
+        database = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        database.close()
+        url = f"sqlite+aiosqlite:///{database.name}"
+    configure_environment(url)
+
+    try:
+        results = asyncio.run(bench(args.requests, args.concurrency))
+    finally:
+        if database is not None:
+            os.unlink(database.name)
+
+    print(f"{'scenario':<10} {'req/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'queries':>8} {'errors':>7}")
+    for name, result in results.items():
+        print(f"{name:<10} {result['throughput']:8.1f} {result['p50_ms']:9.1f} {result['p95_ms']:9.1f} "
+              f"{result['p99_ms']:9.1f} {result['queries_per_request']:8.2f} {result['errors']:7}")
+
+    report = {
+        "database": url.split(":", 1)[0],
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "python": platform.python_version(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "scenarios": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+
+    failures = sum(result["errors"] > 0 for result in results.values())
+    if args.baseline:
+        failures += compare(results, json.loads(Path(args.baseline).read_text()), args.threshold)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.domain.entities.chat import ChatMessage, MessageCursor
+from app.infrastructure.repositories.chat_repository import InMemoryChatRepository
+
+ROOM_ID = "bench"
+
+def build_history(size: int):
+    """Yield `size` messages in timestamp order without pydantic validation."""
+    start = datetime(2024, 1, 1)
+    for i in range(size):
+        yield ChatMessage.model_construct(
+            id=str(i),
+            content=f"message {i}",
+            sender="bench",
+            timestamp=start + timedelta(milliseconds=i),
+            room_id=ROOM_ID
+        )
+
+def legacy_get_messages(messages, limit: int):
+    """The previous implementation: sort the whole history on every read."""
+    return sorted(messages, key=lambda x: x.timestamp, reverse=True)[:limit]
+
+async def bench(size: int, limit: int, iterations: int, compare: bool):
+    repo = InMemoryChatRepository(max_history=size)
+    for message in build_history(size):
+        await repo.save_message(message)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await repo.get_messages(ROOM_ID, limit)
+    ring_us = (time.perf_counter() - start) / iterations * 1e6
+
+    legacy_us = None
+    if compare:
+        history = list(repo.messages[ROOM_ID])
+        legacy_iterations = max(1, iterations // 100)
+        start = time.perf_counter()
+        for _ in range(legacy_iterations):
+            legacy_get_messages(history, limit)
+        legacy_us = (time.perf_counter() - start) / legacy_iterations * 1e6
+
+    return ring_us, legacy_us
+
+async def check_stream_after() -> bool:
+    """Streaming forward from an `after` cursor must cross chunk boundaries."""
+    repo = InMemoryChatRepository(max_history=500)
+    history = list(build_history(500))
+    await repo.save_messages(history)
+    after = MessageCursor.from_message(history[10])
+    streamed = [message.id async for message in repo.iter_messages(ROOM_ID, 300, after=after)]
+    expected = [str(i) for i in range(11, 311)]
+    ok = streamed == expected
+    print(f"stream after a cursor: {len(streamed)} messages, {'ok' if ok else 'expected 11..310 oldest first'}")
+    return ok
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark InMemoryChatRepository.get_messages")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="Comma-separated history sizes")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--compare", action="store_true",
+                        help="Also time the previous sort-and-slice implementation")
+    args = parser.parse_args()
+
+    if not await check_stream_after():
+        sys.exit(1)
+
+    print(f"{'history':>10} {'ring buffer (us)':>18} {'sort+slice (us)':>18}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        ring_us, legacy_us = await bench(size, args.limit, args.iterations, args.compare)
+        legacy = f"{legacy_us:18.1f}" if legacy_us is not None else f"{'-':>18}"
+        print(f"{size:>10} {ring_us:18.1f} {legacy}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
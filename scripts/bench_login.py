@@ -0,0 +1,132 @@
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.domain.entities.user import UserCreate, UserInDB, UserSummary, UserUpdate
+from app.domain.interfaces.repositories.user_repository import IUserRepository
+from app.domain.use_cases.user_use_case import UserUseCase
+from app.infrastructure.security.password_hasher import ProcessPoolPasswordHasher, hash_password
+
+PASSWORD = "correct horse battery staple"
+
+class SingleUserRepository(IUserRepository):
+    """Serves one pre-hashed user so that only password verification is measured."""
+
+    def __init__(self):
+        self.user = UserInDB(
+            id=1,
+            email="bench@example.com",
+            username="bench",
+            hashed_password=hash_password(PASSWORD),
+            created_at=datetime.utcnow(),
+        )
+
+    async def get_by_id(self, user_id: int) -> Optional[UserInDB]:
+        return self.user
+
+    async def get_by_email(self, email: str) -> Optional[UserInDB]:
+        return self.user
+
+    # Writes are never benchmarked; the one user stays as it is
+
+    async def create(self, user: UserCreate) -> UserInDB:
+        return self.user
+
+    async def update(self, user_id: int, user_update: UserUpdate) -> Optional[UserInDB]:
+        return self.user
+
+    async def delete(self, user_id: int) -> bool:
+        return False
+
+    async def bulk_create(self, users: List[UserCreate], on_conflict: str = "ignore") -> Tuple[int, Dict[int, str]]:
+        return 0, {}
+
+    async def list_users(
+        self,
+        limit: int = 100,
+        after_id: Optional[int] = None,
+        is_active: Optional[bool] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> List[UserSummary]:
+        return []
+
+async def probe_loop_lag(interval: float, lags: list, stop: asyncio.Event):
+    """Record how late the event loop wakes a 'ping' — what other requests would feel."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - start - interval)
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+async def bench(workers: int, logins: int, concurrency: int, max_concurrency: int):
+    hasher = ProcessPoolPasswordHasher(
+        workers=workers,
+        max_concurrency=max_concurrency,
+        queue_timeout_ms=600000,
+    )
+    await hasher.start()
+    use_case = UserUseCase(SingleUserRepository(), hasher)
+    remaining = iter(range(logins))
+    latencies = []
+
+    async def client():
+        for _ in remaining:
+            start = time.perf_counter()
+            user = await use_case.authenticate_user("bench@example.com", PASSWORD)
+            latencies.append(time.perf_counter() - start)
+            assert user is not None
+
+    lags = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(0.01, lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    await hasher.shutdown()
+
+    return {
+        "throughput": logins / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_loop_lag_ms": max(lags, default=0.0) * 1000,
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark login (password verification) under concurrent load")
+    parser.add_argument("--logins", type=int, default=64, help="Total logins to perform")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--workers", type=int, default=2, help="Hashing processes (0 = inline)")
+    parser.add_argument("--max-concurrency", type=int, default=16,
+                        help="Password operations admitted at once")
+    parser.add_argument("--compare", action="store_true",
+                        help="Also run the previous inline behavior (workers=0)")
+    args = parser.parse_args()
+
+    runs = [("pool", args.workers)]
+    if args.compare:
+        runs.insert(0, ("inline", 0))
+
+    print(f"{'mode':>8} {'logins/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'max loop lag (ms)':>18}")
+    for name, workers in runs:
+        result = await bench(workers, args.logins, args.concurrency, args.max_concurrency)
+        print(
+            f"{name:>8} {result['throughput']:10.1f} {result['p50_ms']:10.1f} "
+            f"{result['p99_ms']:10.1f} {result['max_loop_lag_ms']:18.1f}"
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.domain.entities.user import UserInDB
+from app.domain.interfaces.repositories.user_repository import IUserRepository
+from app.infrastructure.database import Base
+from app.infrastructure.database.models.user import User
+from app.infrastructure.repositories.user_repository import UserRepository
+
+class LegacyUserRepository(UserRepository):
+    """The previous lookups: a fresh ORM select, hydrated into User, then validated."""
+
+    async def get_by_id(self, user_id: int):
+        result = await self.db.execute(select(User).filter(User.id == user_id))
+        user = result.scalars().first()
+        return UserInDB.model_validate(user) if user else None
+
+    async def get_by_email(self, email: str):
+        result = await self.db.execute(select(User).filter(User.email == email))
+        user = result.scalars().first()
+        return UserInDB.model_validate(user) if user else None
+
+    # Login used to load the full user
+    get_principal_by_email = IUserRepository.get_principal_by_email
+
+async def seed(session_factory, users: int):
+    async with session_factory() as db:
+        await db.execute(insert(User), [
+            {
+                "email": f"user{i}@example.com",
+                "username": f"user{i}",
+                "full_name": f"User {i}",
+                "hashed_password": "x" * 60,
+                "is_active": True,
+            }
+            for i in range(1, users + 1)
+        ])
+        await db.commit()
+
+async def lookups_per_second(session_factory, repository_class, lookup: str, users: int, iterations: int) -> float:
+    async with session_factory() as db:
+        repository = repository_class(db)
+        fetch = getattr(repository, lookup)
+        keys = [
+            i if lookup == "get_by_id" else f"user{i}@example.com"
+            for i in (n % users + 1 for n in range(iterations))
+        ]
+        # Warm up statement caches before timing
+        for key in keys[:100]:
+            await fetch(key)
+        start = time.perf_counter()
+        for key in keys:
+            assert await fetch(key) is not None
+        elapsed = time.perf_counter() - start
+        # Long-lived sessions are where the identity map costs the most
+        db.expunge_all()
+    return iterations / elapsed
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark ORM vs Core user lookups")
+    parser.add_argument("--url", default="sqlite+aiosqlite://",
+                        help="Async database URL (tables are dropped and recreated)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    await seed(session_factory, args.users)
+
+    print(f"{'lookup':<22} {'ORM (/s)':>10} {'Core (/s)':>10} {'speedup':>8}")
+    for lookup in ("get_by_id", "get_by_email", "get_principal_by_email"):
+        orm = await lookups_per_second(session_factory, LegacyUserRepository, lookup, args.users, args.iterations)
+        core = await lookups_per_second(session_factory, UserRepository, lookup, args.users, args.iterations)
+        print(f"{lookup:<22} {orm:10.0f} {core:10.0f} {core / orm:7.2f}x")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
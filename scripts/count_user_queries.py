@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.domain.entities.user import UserCreate, UserUpdate
+from app.domain.use_cases.user_use_case import UserUseCase
+from app.infrastructure.database import Base
+from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.security.password_hasher import ProcessPoolPasswordHasher
+
+# Statements each UserUseCase write may issue
+BUDGET = 1
+
+def new_user(name: str) -> UserCreate:
+    return UserCreate(email=f"{name}@example.com", username=name, password="secret")
+
+async def count_queries(url: str) -> int:
+    engine = create_async_engine(url)
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    hasher = ProcessPoolPasswordHasher(workers=0)
+    # Without UPDATE ... RETURNING (MySQL) a successful update reads the row back
+    update_budget = BUDGET if engine.dialect.update_returning else BUDGET + 1
+    failures = 0
+    async with session_factory() as db:
+        use_case = UserUseCase(UserRepository(db, hasher), hasher)
+        alice = await use_case.create_user(new_user("alice"))
+        await use_case.create_user(new_user("bob"))
+        await db.commit()
+
+        operations = [
+            ("create", BUDGET, lambda: use_case.create_user(new_user("carol"))),
+            ("create, duplicate email", BUDGET, lambda: use_case.create_user(
+                UserCreate(email="alice@example.com", username="alice2", password="secret"))),
+            ("create, duplicate username", BUDGET, lambda: use_case.create_user(
+                UserCreate(email="alice2@example.com", username="alice", password="secret"))),
+            ("update", update_budget, lambda: use_case.update_user(alice.id, UserUpdate(full_name="Alice"))),
+            ("update, email in use", BUDGET, lambda: use_case.update_user(alice.id, UserUpdate(email="bob@example.com"))),
+            ("update, missing user", BUDGET, lambda: use_case.update_user(-1, UserUpdate(full_name="Nobody"))),
+            ("delete", BUDGET, lambda: use_case.delete_user(alice.id)),
+            ("delete, missing user", BUDGET, lambda: use_case.delete_user(alice.id)),
+        ]
+
+        print(f"{'operation':<28} {'queries':>7}  outcome")
+        for name, budget, operation in operations:
+            statements.clear()
+            try:
+                await operation()
+                outcome = "ok"
+            except ValueError as e:
+                outcome = f"ValueError: {e}"
+            # The session owner commits or rolls back, as get_db does per request
+            count = len(statements)
+            if outcome == "ok":
+                await db.commit()
+            else:
+                await db.rollback()
+            flag = "" if count <= budget else "  <-- over budget"
+            failures += count > budget
+            print(f"{name:<28} {count:>7}  {outcome}{flag}")
+
+    await engine.dispose()
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Count the SQL statements issued by each UserUseCase write")
+    parser.add_argument("--url", default="sqlite+aiosqlite://",
+                        help="Async database URL (tables are dropped and recreated)")
+    args = parser.parse_args()
+    sys.exit(1 if asyncio.run(count_queries(args.url)) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.domain.use_cases.user_use_case import UserUseCase
+from app.infrastructure.database import AsyncSessionLocal
+from app.infrastructure.importers.user_records import iter_user_records
+from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.security.password_hasher import ProcessPoolPasswordHasher
+
+async def read_chunks(path: Path, chunk_size: int = 1 << 16):
+    """Stream a file in fixed-size byte chunks."""
+    with path.open("rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+def print_progress(result):
+    print(
+        f"\r{result.total} rows read, {result.written} written, {result.skipped} skipped, "
+        f"{result.failed} failed ({result.rows_per_second:.0f} rows/s)",
+        end="",
+        flush=True,
+    )
+
+async def import_users(args) -> int:
+    path = Path(args.file)
+    format = args.format or ("csv" if path.suffix.lower() == ".csv" else "ndjson")
+    hasher = ProcessPoolPasswordHasher(workers=args.workers)
+    await hasher.start()
+    try:
+        async with AsyncSessionLocal() as db:
+            use_case = UserUseCase(UserRepository(db, hasher), hasher)
+            result = await use_case.import_users(
+                iter_user_records(read_chunks(path), format),
+                on_conflict=args.on_conflict,
+                chunk_size=args.chunk_size,
+                max_errors=args.max_errors,
+                progress=print_progress,
+            )
+    finally:
+        await hasher.shutdown()
+
+    print_progress(result)
+    print(f"\nDone in {result.elapsed_seconds:.1f}s")
+    for error in result.errors:
+        print(f"  line {error.line} ({error.email or '-'}): {error.error}")
+    if result.failed > len(result.errors):
+        print(f"  ... and {result.failed - len(result.errors)} more failures")
+    return 1 if result.failed else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import users from a CSV or NDJSON file")
+    parser.add_argument("file", help="CSV (with header row) or NDJSON file of users")
+    parser.add_argument("--format", choices=["csv", "ndjson"],
+                        help="Input format (default: from the file extension)")
+    parser.add_argument("--on-conflict", choices=["ignore", "upsert"], default="ignore",
+                        help="Keep or overwrite users whose email already exists")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per multi-row INSERT")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Password hashing processes")
+    parser.add_argument("--max-errors", type=int, default=100, help="Row failures to print")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(import_users(args)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.infrastructure.kafka.consumer_service import consumer_service
+from app.infrastructure.redis.redis_client import RedisClient
+
+async def serve():
+    """Run the consumer service until SIGINT or SIGTERM, then shut it down cleanly."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await consumer_service.start()
+    try:
+        await stop.wait()
+    finally:
+        await consumer_service.stop()
+        await RedisClient.close()
+
+def run_worker():
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s [{os.getpid()}] %(levelname)s %(message)s")
+    asyncio.run(serve())
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the Kafka consumer service; processes share the topic's partitions through the consumer group"
+    )
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Number of consumer processes (0 uses one per CPU core)")
+    args = parser.parse_args()
+
+    processes = args.processes or os.cpu_count() or 1
+    if processes == 1:
+        run_worker()
+        return
+
+    workers = [multiprocessing.Process(target=run_worker) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+
+    def forward(signum, frame):
+        for worker in workers:
+            if worker.is_alive():
+                os.kill(worker.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGINT, forward)
+    signal.signal(signal.SIGTERM, forward)
+    for worker in workers:
+        worker.join()
+    sys.exit(max((worker.exitcode or 0) for worker in workers))
+
+if __name__ == "__main__":
+    main()